@@ -0,0 +1,124 @@
+import atexit
+import contextvars
+import logging
+import os
+import threading
+from django.conf import settings
+from contextlib import contextmanager
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+from api.models import ActivityLog, User
+
+logger = logging.getLogger(__name__)
+
+_suppressed_actions = contextvars.ContextVar('suppressed_activity_actions', default=frozenset())
+
+
+@contextmanager
+def suppress_activity(*action_types):
+    """Drop per-row entries of these action types, e.g. while a bulk write records one summary."""
+    token = _suppressed_actions.set(_suppressed_actions.get() | frozenset(action_types))
+    try:
+        yield
+    finally:
+        _suppressed_actions.reset(token)
+
+
+def activity_suppressed(action_type):
+    """True inside suppress_activity() for this action type; lets receivers skip building details."""
+    return action_type in _suppressed_actions.get()
+
+
+class ActivitySink:
+    """
+    Collects ActivityLog rows in memory and writes them with bulk_create.
+
+    Entries recorded inside a transaction are only queued once it commits (and dropped if it
+    rolls back). A background thread flushes the queue every ACTIVITY_LOG_FLUSH_INTERVAL
+    seconds, or as soon as ACTIVITY_LOG_BATCH_SIZE entries are waiting, so request threads
+    never issue the INSERT themselves. Whatever is left is drained at interpreter exit.
+
+    ACTIVITY_LOG_MODE = 'sync' writes every entry immediately, which is what tests want.
+    """
+    def __init__(self):
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def synchronous(self):
+        return getattr(settings, 'ACTIVITY_LOG_MODE', 'buffered') == 'sync'
+
+    def record(self, user, action_type, details=""):
+        if activity_suppressed(action_type):
+            return
+        entry = ActivityLog(
+            user_id=user.pk if user else None,
+            action_type=action_type,
+            details=details,
+            timestamp=timezone.now(),
+        )
+        if self.synchronous:
+            self._write([entry])
+        elif connection.in_atomic_block:
+            transaction.on_commit(lambda: self._enqueue([entry]))
+        else:
+            self._enqueue([entry])
+
+    def _enqueue(self, entries):
+        self._ensure_thread()
+        with self._lock:
+            self._buffer.extend(entries)
+            full = len(self._buffer) >= getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 100)
+        if full:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Also restarts the flusher in forked workers, where the parent's thread does not exist
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-log-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 2.0)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            ActivityLog.objects.bulk_create(batch, batch_size=500)
+        except IntegrityError:
+            # A user deleted since the entry was recorded; keep the row, drop the link
+            existing = set(User.objects.filter(pk__in={e.user_id for e in batch if e.user_id}).values_list('pk', flat=True))
+            for entry in batch:
+                if entry.user_id not in existing:
+                    entry.user_id = None
+            try:
+                ActivityLog.objects.bulk_create(batch, batch_size=500)
+            except Exception as e:
+                logger.error("Failed to write %s activity log entries: %s", len(batch), e)
+        except Exception as e:
+            logger.error("Failed to write %s activity log entries: %s", len(batch), e)
+
+
+activity_sink = ActivitySink()
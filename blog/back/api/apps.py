@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Connect the signal receivers that keep in-process indexes current
+        from . import caching, checks, claims, db_pool, slugs, stats, suggest  # noqa: F401
@@ -0,0 +1,105 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from api.revocation import revocation_list
+
+User = get_user_model()
+
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU of User rows keyed by primary key, with a TTL.
+    Entries are dropped on User save/delete in this process; the TTL bounds how long another
+    worker can keep serving a changed user.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, pk):
+        ttl = getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is None:
+                return None
+            user, stored_at = entry
+            if time.monotonic() - stored_at > ttl:
+                del self._entries[pk]
+                return None
+            self._entries.move_to_end(pk)
+        # Hand out a copy so one request cannot mutate the instance another request sees
+        return copy.copy(user)
+
+    def set(self, pk, user):
+        max_size = getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+        with self._lock:
+            self._entries[pk] = (copy.copy(user), time.monotonic())
+            self._entries.move_to_end(pk)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, pk):
+        with self._lock:
+            self._entries.pop(pk, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user through user_cache instead of a SELECT on every
+    request. Revoked tokens (api.revocation) are rejected from an in-memory list, again without
+    a query.
+    """
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
@@ -0,0 +1,293 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from api.models import Article, Category, Tag
+from api.signals import bulk_saved
+
+# Generation counters: cache keys embed the current number, so bumping it invalidates every
+# entry built from the old one in O(1). They live in the shared cache, so all workers see a bump.
+GENERATION_KEY = 'generation:{}'
+
+
+def _initial_generation():
+    # Seeded from the clock so a counter lost to eviction never restarts at a number old entries used
+    return int(time.time() * 1000)
+
+
+def get_generation(name):
+    return cache.get_or_set(GENERATION_KEY.format(name), _initial_generation, timeout=None)
+
+
+async def aget_generations(names):
+    """get_generation() for several counters at once, for async views: usually one cache round trip."""
+    keys = [GENERATION_KEY.format(name) for name in names]
+    values = await cache.aget_many(keys)
+    for key in keys:
+        if key not in values:
+            values[key] = await cache.aget_or_set(key, _initial_generation, timeout=None)
+    return [values[key] for key in keys]
+
+
+def bump_generation(name):
+    key = GENERATION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_generation(), timeout=None)
+        return cache.incr(key)
+
+
+def bump_generations_on_commit(names):
+    """
+    Bump once the writer's transaction commits (at once outside one). Bumping earlier lets a
+    concurrent reader miss, read the rows as they were before the commit and cache them under
+    the new generation, where they would be served until the timeout.
+    """
+    names = list(names)
+
+    def bump():
+        for name in names:
+            bump_generation(name)
+
+    transaction.on_commit(bump, robust=True)
+
+
+def response_cache_enabled():
+    # Off by default with a per-process cache: other workers would never see a bump (see settings)
+    return getattr(settings, 'RESPONSE_CACHE', True)
+
+
+CACHE_STATS_KEY = 'cache-stats:{}:{}'
+CACHE_STATS_NAMES = ('article', 'category', 'tag')
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def record_cache_event(name, event):
+    _incr(CACHE_STATS_KEY.format(name, event))
+
+
+async def arecord_cache_event(name, event):
+    key = CACHE_STATS_KEY.format(name, event)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def cache_stats():
+    values = cache.get_many([CACHE_STATS_KEY.format(name, event) for name in CACHE_STATS_NAMES for event in ('hit', 'miss')])
+    return {
+        name: {
+            'hits': values.get(CACHE_STATS_KEY.format(name, 'hit'), 0),
+            'misses': values.get(CACHE_STATS_KEY.format(name, 'miss'), 0),
+        }
+        for name in CACHE_STATS_NAMES
+    }
+
+
+def generation_cache_key(name, generation, suffix):
+    return f'{name}:{generation}:{suffix}'
+
+
+class GenerationCachedMixin:
+    """
+    list() and retrieve() served from the cache under a key that embeds the generation named by
+    `cache_generation`. Save/delete receivers below bump that generation, so a write invalidates
+    every cached list and detail of the model at once.
+    """
+    cache_generation = None
+
+    def _cached_response(self, suffix, build):
+        if not response_cache_enabled():
+            return Response(build())
+        key = generation_cache_key(self.cache_generation, get_generation(self.cache_generation), suffix)
+        data = cache.get(key)
+        if data is None:
+            record_cache_event(self.cache_generation, 'miss')
+            data = build()
+            cache.set(key, data, getattr(settings, 'TAXONOMY_CACHE_TIMEOUT', 3600))
+        else:
+            record_cache_event(self.cache_generation, 'hit')
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response('list', lambda: list(super(GenerationCachedMixin, self).list(request, *args, **kwargs).data))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self._cached_response(f'detail:{pk}', lambda: dict(super(GenerationCachedMixin, self).retrieve(request, *args, **kwargs).data))
+
+
+def _article_generation_name(article_id):
+    return f'article:{article_id}'
+
+
+def article_detail_generation_names(pk):
+    # The article's own generation plus the category and tag ones (names in category_details / tag_details)
+    return (_article_generation_name(pk), 'category', 'tag')
+
+
+def article_detail_variant(serializer_class, request):
+    # Sparse fieldsets (?fields= / ?omit= / ?excerpt_length=) are cached as separate variants
+    selected = ','.join(sorted(serializer_class.selected_fields(request)))
+    if 'excerpt' in selected:
+        selected += f':{serializer_class.excerpt_length(request)}'
+    return hashlib.md5(selected.encode()).hexdigest()[:12]
+
+
+def article_detail_cache_key(pk, generations, variant):
+    return 'article-detail:{}:{}:{}:{}:{}'.format(pk, *generations, variant)
+
+
+def article_detail_entry(key, instance, data):
+    return {
+        'data': data,
+        'etag': quote_etag(hashlib.md5(f"{key}:{instance.updated_at.isoformat()}".encode()).hexdigest()),
+        'last_modified': int(instance.updated_at.timestamp()),
+    }
+
+
+def article_validators(pk, variant, updated_at):
+    """
+    ETag and Last-Modified of an article detail variant when its payload is not cached: derived
+    from the row's updated_at only, so they agree across workers without a shared cache.
+    """
+    return {
+        'etag': quote_etag(hashlib.md5(f"article:{pk}:{variant}:{updated_at.isoformat()}".encode()).hexdigest()),
+        'last_modified': int(updated_at.timestamp()),
+    }
+
+
+def article_updated_at(pk):
+    return Article.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
+
+async def aarticle_updated_at(pk):
+    return await Article.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+
+
+def not_modified_response(request, validators):
+    """A 304 when the request's If-None-Match / If-Modified-Since still match, else None."""
+    return get_conditional_response(request, etag=validators['etag'], last_modified=validators['last_modified'])
+
+
+def set_validators(response, validators):
+    response['ETag'] = validators['etag']
+    response['Last-Modified'] = http_date(validators['last_modified'])
+    return response
+
+
+def article_detail_response(request, entry):
+    """The cached payload, or a 304 when the request's validators still match it."""
+    not_modified = not_modified_response(request, entry)
+    return set_validators(not_modified if not_modified is not None else Response(entry['data']), entry)
+
+
+class CachedArticleDetailMixin:
+    """
+    retrieve() for article detail views with a per-article cache of the serialized payload and
+    conditional GET support. A hit answers from the cache with no query and no serialization;
+    a matching If-None-Match / If-Modified-Since gets a 304.
+
+    The cache key includes the article's own generation (bumped on save, delete and
+    categories/tags changes) and the category and tag generations (bumped when a name changes,
+    which alters category_details / tag_details).
+
+    With RESPONSE_CACHE off, the validators come from the article's updated_at (one single-column
+    query), and a matching request still gets its 304 before anything is loaded or serialized.
+    """
+    def _detail_cache_key(self, pk):
+        generations = [get_generation(name) for name in article_detail_generation_names(pk)]
+        return article_detail_cache_key(pk, generations, article_detail_variant(self.get_serializer_class(), self.request))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if not response_cache_enabled():
+            return self._conditional_retrieve(request, pk)
+        key = self._detail_cache_key(pk)
+        entry = cache.get(key)
+        if entry is None:
+            record_cache_event('article', 'miss')
+            instance = self.get_object()
+            entry = article_detail_entry(key, instance, self.get_serializer(instance).data)
+            cache.set(key, entry, getattr(settings, 'ARTICLE_CACHE_TIMEOUT', 300))
+        else:
+            record_cache_event('article', 'hit')
+        return article_detail_response(request, entry)
+
+    def _conditional_retrieve(self, request, pk):
+        instance = None
+        updated_at = article_updated_at(pk)
+        if updated_at is None:
+            # Let get_object() raise the 404 (slug routes retry a stale id there)
+            instance = self.get_object()
+            pk, updated_at = instance.pk, instance.updated_at
+        validators = article_validators(pk, article_detail_variant(self.get_serializer_class(), request), updated_at)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return set_validators(not_modified, validators)
+        if instance is None:
+            instance = self.get_object()
+        return set_validators(Response(self.get_serializer(instance).data), validators)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_detail(sender, instance, **kwargs):
+    bump_generations_on_commit([_article_generation_name(instance.pk)])
+
+
+@receiver(m2m_changed, sender=Article.categories.through)
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_article_detail_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._cache_article_ids = list(instance.articles.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        article_ids = [instance.pk]
+    elif action == 'post_clear':
+        article_ids = getattr(instance, '_cache_article_ids', [])
+    else:
+        article_ids = pk_set
+    bump_generations_on_commit(_article_generation_name(article_id) for article_id in article_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, **kwargs):
+    bump_generations_on_commit(['category'])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_caches(sender, **kwargs):
+    bump_generations_on_commit(['tag'])
+
+
+@receiver(bulk_saved, sender=Article)
+def invalidate_article_detail_bulk(sender, instances, **kwargs):
+    bump_generations_on_commit(_article_generation_name(instance.pk) for instance in instances)
+
+
+@receiver(bulk_saved, sender=Category)
+@receiver(bulk_saved, sender=Tag)
+def invalidate_taxonomy_caches_bulk(sender, instances, **kwargs):
+    if instances:
+        bump_generations_on_commit(['category' if sender is Category else 'tag'])
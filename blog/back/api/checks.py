@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    """
+    RESPONSE_CACHE defaults to off with the per-process LocMemCache (see settings). Warn so that
+    running without the response caches is a decision, not a leftover of the default backend.
+    """
+    if getattr(settings, 'RESPONSE_CACHE', True):
+        return []
+    return [Warning(
+        "Response caches for article detail, categories and tags are off.",
+        hint="Point CACHE_BACKEND at a cache shared by every worker (e.g. Redis), or set RESPONSE_CACHE=true "
+             "for a single-process server. To run without them on purpose, add 'api.W001' to "
+             "SILENCED_SYSTEM_CHECKS (conditional GETs keep working either way).",
+        id='api.W001',
+    )]
@@ -0,0 +1,124 @@
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.models import UserProfile
+from api.revocation import revocation_list, revoke_user_claims
+
+# Claim holding the role snapshot: {'is_staff': bool, 'groups': [ids], 'user_type': str}
+PERMISSION_CLAIM = 'perms'
+
+ANONYMOUS_SNAPSHOT = {'is_staff': False, 'groups': [], 'user_type': None}
+
+
+def permission_snapshot(user):
+    user_type = UserProfile.objects.filter(user_id=user.pk).values_list('user_type', flat=True).first()
+    return {
+        'is_staff': user.is_staff,
+        'groups': sorted(user.groups.values_list('id', flat=True)),
+        'user_type': user_type or 'regular',
+    }
+
+
+class SnapshotRefreshToken(RefreshToken):
+    """
+    RefreshToken whose access tokens carry a permission snapshot of the user. The snapshot is
+    taken at login and retaken on refresh whenever a role change has made it stale.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[PERMISSION_CLAIM] = permission_snapshot(user)
+        return token
+
+    @property
+    def access_token(self):
+        if self.get(PERMISSION_CLAIM) is None or revocation_list.claims_stale(self):
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}).first()
+            if user is not None:
+                # Also stored on the refresh token, so a rotated one carries the new snapshot
+                self[PERMISSION_CLAIM] = permission_snapshot(user)
+        return super().access_token
+
+
+def get_permission_snapshot(request):
+    """
+    Role snapshot of request.user: from the access token when it is current, otherwise from the
+    database, computed once per request.
+    """
+    django_request = getattr(request, '_request', request)
+    snapshot = getattr(django_request, '_permission_snapshot', None)
+    if snapshot is not None:
+        return snapshot
+
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        snapshot = ANONYMOUS_SNAPSHOT
+    else:
+        token = getattr(request, 'auth', None)
+        claims = token.get(PERMISSION_CLAIM) if hasattr(token, 'get') else None
+        if claims is None or revocation_list.claims_stale(token):
+            claims = permission_snapshot(user)
+        snapshot = claims
+    django_request._permission_snapshot = snapshot
+    return snapshot
+
+
+def request_is_staff(request):
+    return get_permission_snapshot(request)['is_staff']
+
+
+# Receivers below mark outstanding snapshots stale whenever an input to them changes.
+
+@receiver(post_init, sender=User)
+def remember_user_staff_flag(sender, instance, **kwargs):
+    # __dict__ so that a deferred is_staff is not loaded just for this
+    instance._snapshot_is_staff = instance.__dict__.get('is_staff')
+
+
+@receiver(post_save, sender=User)
+def user_staff_flag_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'is_staff' not in update_fields):
+        return
+    if instance._snapshot_is_staff != instance.is_staff:
+        revoke_user_claims([instance.pk])
+    instance._snapshot_is_staff = instance.is_staff
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_profile_user_type(sender, instance, **kwargs):
+    instance._snapshot_user_type = instance.__dict__.get('user_type')
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_user_type_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'user_type' not in update_fields):
+        return
+    if instance._snapshot_user_type != instance.user_type:
+        revoke_user_claims([instance.user_id])
+    instance._snapshot_user_type = instance.user_type
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._snapshot_user_ids = list(instance.user_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_snapshot_user_ids', [])
+    else:
+        user_ids = pk_set
+    if user_ids:
+        revoke_user_claims(user_ids)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    user_ids = list(instance.user_set.values_list('pk', flat=True))
+    if user_ids:
+        revoke_user_claims(user_ids)
@@ -0,0 +1,54 @@
+from collections import defaultdict
+from api.models import Comment
+from api.serializers import CommentSerializer
+
+# CommentSerializer renders the roots plus three levels of replies; reply counts come from
+# Comment.reply_count, so nothing below that needs loading.
+TREE_LOAD_LEVELS = 3
+
+
+class CommentTree:
+    """
+    In-memory reply tree built from a flat list of comments.
+    The serializer reads children from here instead of querying per comment.
+    """
+    def __init__(self, comments, root_parent_id=None):
+        self.roots = []
+        self.children = defaultdict(list)
+        for comment in comments:
+            if comment.parent_id == root_parent_id:
+                self.roots.append(comment)
+            else:
+                self.children[comment.parent_id].append(comment)
+
+    def replies(self, comment):
+        return self.children.get(comment.id, [])
+
+
+def comment_tree_queryset(article_id, request=None):
+    comments = (
+        Comment.objects
+        .filter(article_id=article_id, depth__lte=TREE_LOAD_LEVELS)
+        .select_related('author')
+        .order_by('path')
+    )
+    return CommentSerializer.annotate_viewer(comments, request)
+
+
+def load_comment_tree(article_id, request=None):
+    return CommentTree(comment_tree_queryset(article_id, request))
+
+
+async def aload_comment_tree(article_id, request=None):
+    return CommentTree([comment async for comment in comment_tree_queryset(article_id, request)])
+
+
+def load_reply_tree(comment, request=None):
+    """Replies below `comment`, fetched with one range scan on the path index."""
+    comments = (
+        comment.descendants()
+        .filter(depth__lte=comment.depth + 1 + TREE_LOAD_LEVELS)
+        .select_related('author')
+        .order_by('path')
+    )
+    return CommentTree(CommentSerializer.annotate_viewer(comments, request), root_parent_id=comment.id)
@@ -0,0 +1,88 @@
+import threading
+from collections import Counter
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# psycopg_pool statistics reported by pool_stats(), under the names used there
+POOL_STATS = {
+    'pool_size': 'size',
+    'pool_available': 'available',
+    'requests_num': 'checkouts',
+    'requests_queued': 'waits',
+    'requests_wait_ms': 'wait_ms',
+    'requests_timeouts': 'timeouts',
+    'connections_num': 'connections_opened',
+    'connections_ms': 'connect_ms',
+    'connections_errors': 'connect_errors',
+    'connections_lost': 'connections_lost',
+    'returns_bad': 'returned_broken',
+}
+
+
+class ConnectionCounters:
+    """
+    Per-process counts of requests and of connections Django acquired for them. Without a pool
+    every acquisition is a new TCP connection and authentication handshake, so
+    acquisitions / requests is the share of requests that paid for one.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def add(self, name, alias=None):
+        with self._lock:
+            self._counts[name if alias is None else f'{alias}:{name}'] += 1
+
+    def get(self, name, alias=None):
+        with self._lock:
+            return self._counts[name if alias is None else f'{alias}:{name}']
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+counters = ConnectionCounters()
+
+
+@receiver(request_started)
+def count_request(sender, **kwargs):
+    counters.add('requests')
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    counters.add('acquired', connection.alias)
+
+
+def _pool_options(connection):
+    return connection.settings_dict.get('OPTIONS', {}).get('pool')
+
+
+def pool_stats():
+    """Connection reuse for every configured database in this worker process."""
+    requests = counters.get('requests')
+    databases = {}
+    for connection in connections.all(initialized_only=False):
+        acquired = counters.get('acquired', connection.alias)
+        stats = {
+            'mode': 'pool' if _pool_options(connection) else ('persistent' if connection.settings_dict['CONN_MAX_AGE'] else 'per-request'),
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'acquired': acquired,
+            'acquired_per_request': round(acquired / requests, 3) if requests else None,
+        }
+        if stats['mode'] == 'pool':
+            options = _pool_options(connection)
+            stats['limits'] = {
+                name: options.get(name) for name in ('min_size', 'max_size', 'timeout', 'max_idle', 'max_lifetime')
+            } if isinstance(options, dict) else {}
+            pool_values = connection.pool.get_stats()
+            stats.update({name: pool_values.get(key, 0) for key, name in POOL_STATS.items()})
+        else:
+            # Without a pool each acquisition opens a new connection
+            stats['connections_opened'] = acquired
+        databases[connection.alias] = stats
+    return {'requests': requests, 'databases': databases}
@@ -0,0 +1,111 @@
+import random
+from contextvars import ContextVar
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_primary_pin'
+USER_PIN_KEY = 'db-primary-pin:user:{}'
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+class RoutingState:
+    """
+    Where one request's reads go. Decided lazily on the first read, so a request answered from
+    the cache costs nothing here, and switched to the primary for good by the first write.
+    """
+    def __init__(self, request):
+        self.request = request
+        self.wrote = False
+        self._alias = None
+
+    def read_alias(self):
+        if self._alias is None:
+            replicas = replica_aliases()
+            if not replicas or self.request.method not in SAFE_METHODS or self.pinned():
+                self._alias = DEFAULT_DB_ALIAS
+            else:
+                # One replica per request, so its reads see one consistent snapshot
+                self._alias = random.choice(replicas)
+        return self._alias
+
+    def mark_write(self):
+        self.wrote = True
+        self._alias = DEFAULT_DB_ALIAS
+
+    def pinned(self):
+        """True while this client's last write may not have reached the replicas yet."""
+        if self.request.COOKIES.get(PIN_COOKIE):
+            return True
+        user_id = request_user_id(self.request)
+        return user_id is not None and cache.get(USER_PIN_KEY.format(user_id)) is not None
+
+
+routing_state = ContextVar('db_routing_state', default=None)
+
+
+def request_user_id(request):
+    """
+    The user id claim of the request's bearer token, for looking up a pin before the view has
+    authenticated anyone. Unverified on purpose: it only decides which database answers, and the
+    token is verified as usual before anything is served. A forged token can at most send the
+    forger's own reads to the primary; pins are only ever set for authenticated users.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        claims = jwt.decode(header.split(' ', 1)[1], options={'verify_signature': False})
+    except jwt.InvalidTokenError:
+        return None
+    return claims.get(api_settings.USER_ID_CLAIM)
+
+
+def pin_client(request, response):
+    """After a write, send this client's reads to the primary for REPLICA_PIN_SECONDS."""
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    # Token clients may not keep cookies: pin the user as well, in the shared cache. request.user
+    # is the one the view authenticated (DRF sets it on the Django request too)
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(USER_PIN_KEY.format(getattr(user, api_settings.USER_ID_FIELD)), 1, seconds)
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to a replica (DATABASES entries named replica1, replica2, ...) only inside a
+    safe-method request that has not written, whose client is not pinned to the primary (see
+    pin_client) and outside transactions. Everything else, management commands and background
+    work included, uses the primary. Without replicas configured this router changes nothing.
+    """
+    # Reads that must never lag: a just-revoked token has to stop working everywhere
+    primary_models = {'api.revokedtoken'}
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or model._meta.label_lower in self.primary_models:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.mark_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db == DEFAULT_DB_ALIAS
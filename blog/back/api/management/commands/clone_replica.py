@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from api.db_router import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Local stand-in for replication: recreate each replica database as a copy of the primary. "
+        "Only for replicas on the primary's server under another name (DB_REPLICA_NAME); the copy "
+        "then lags until the next run, which makes read-your-writes pinning easy to observe."
+    )
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured; set DB_REPLICA_HOSTS and DB_REPLICA_NAME.")
+        primary = connections[DEFAULT_DB_ALIAS]
+        quote = primary.ops.quote_name
+        for alias in aliases:
+            replica = connections[alias].settings_dict
+            same_server = (replica['HOST'], replica['PORT']) == (primary.settings_dict['HOST'], primary.settings_dict['PORT'])
+            if not same_server or replica['NAME'] == primary.settings_dict['NAME']:
+                raise CommandError(f"{alias} is not a separate database on the primary's server.")
+
+            # CREATE DATABASE ... TEMPLATE needs the primary to have no other sessions
+            connections[alias].close()
+            primary.close()
+            try:
+                with primary._nodb_cursor() as cursor:
+                    cursor.execute(f"DROP DATABASE IF EXISTS {quote(replica['NAME'])}")
+                    cursor.execute(f"CREATE DATABASE {quote(replica['NAME'])} TEMPLATE {quote(primary.settings_dict['NAME'])}")
+            except DatabaseError as e:
+                raise CommandError(f"Could not copy the primary into {alias} (stop servers using it first): {str(e)}")
+            self.stdout.write(f"{alias}: {replica['NAME']} is now a copy of {primary.settings_dict['NAME']}.")
@@ -0,0 +1,40 @@
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from api.transfer import DEFAULT_CHUNK_SIZE, import_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Load an export_blog NDJSON file into an empty blog, keeping ids and slugs. Everything is "
+        "written in one transaction, so a failed import leaves the database untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="NDJSON file to load, or '-' for stdin.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows buffered per model before they are inserted.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        source = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        try:
+            with transaction.atomic():
+                importer = import_lines(source, chunk_size=options['chunk_size'])
+        except (ValueError, DatabaseError) as e:
+            raise CommandError(f"Import failed, nothing was written: {str(e)}")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        elapsed = time.monotonic() - started
+        rows = sum(importer.counts.values())
+        summary = ", ".join(f"{count} {name}" for name, count in importer.counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary} ({rows} rows in {elapsed:.1f}s, {rows / max(elapsed, 0.001):.0f} rows/s)."
+        ))
+        if importer.without_password:
+            self.stderr.write(self.style.WARNING(
+                f"{importer.without_password} users were exported without their password and cannot "
+                f"sign in until it is reset. Export with --with-passwords to keep them."
+            ))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from api.models import ActivityLog, ActivityLogDaily
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll ActivityLog rows older than the retention window into ActivityLogDaily and delete them "
+        "in bounded batches. Meant to run daily from cron, e.g. "
+        "'15 3 * * * python manage.py prune_activity_log'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 90),
+                            help='Keep raw rows for this many days (default: ACTIVITY_LOG_RETENTION_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows rolled up and deleted per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be pruned.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Roll up whole days only, so a day is never split between raw rows and the rollup
+        cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+        expired = ActivityLog.objects.filter(timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} activity log rows older than {cutoff:%Y-%m-%d} would be pruned.")
+            return
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(expired.order_by('timestamp', 'id').values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                self._roll_up(ids)
+                ActivityLog.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            self.stdout.write(f"Pruned {total} rows...")
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {total} activity log rows older than {cutoff:%Y-%m-%d}."))
+
+    def _roll_up(self, ids):
+        groups = (
+            ActivityLog.objects.filter(id__in=ids)
+            .annotate(day=TruncDate('timestamp'))
+            .values('day', 'user_id', 'action_type')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for group in groups:
+            key = {'day': group['day'], 'user_id': group['user_id'], 'action_type': group['action_type']}
+            # Earlier batches may already have started this day's counter
+            updated = ActivityLogDaily.objects.filter(**key).update(count=F('count') + group['n'])
+            if not updated:
+                ActivityLogDaily.objects.create(count=group['n'], **key)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from api.stats import reconcile, site_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute the site statistics counters (totals and per-day series) from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Only rebuild the daily series for the last N days (totals are always recomputed).')
+
+    def handle(self, *args, **options):
+        reconcile(days=options['days'])
+        totals = ', '.join(f"{name}={value}" for name, value in site_totals().items())
+        self.stdout.write(self.style.SUCCESS(f"Statistics reconciled: {totals}."))
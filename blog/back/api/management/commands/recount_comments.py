@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from api.models import Article, Comment
+
+
+def recount_comment_counters():
+    """Recompute Article.comment_count and Comment.reply_count from the comment rows."""
+    comments_per_article = (
+        Comment.objects.filter(article=OuterRef('pk')).order_by()
+        .values('article').annotate(n=Count('id')).values('n')
+    )
+    replies_per_comment = (
+        Comment.objects.filter(parent=OuterRef('pk')).order_by()
+        .values('parent').annotate(n=Count('id')).values('n')
+    )
+    with transaction.atomic():
+        articles = Article.objects.update(
+            comment_count=Coalesce(Subquery(comments_per_article, output_field=IntegerField()), Value(0))
+        )
+        comments = Comment.objects.update(
+            reply_count=Coalesce(Subquery(replies_per_comment, output_field=IntegerField()), Value(0))
+        )
+    return articles, comments
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Article.comment_count and Comment.reply_count columns."
+
+    def handle(self, *args, **options):
+        articles, comments = recount_comment_counters()
+        self.stdout.write(self.style.SUCCESS(f"Recounted {articles} articles and {comments} comments."))
@@ -1,8 +1,71 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from api.db_router import SAFE_METHODS, RoutingState, pin_client, replica_aliases, routing_state
+
+
 class ApiCSRFExemptMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.exempt(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.exempt(request)
+        return await self.get_response(request)
+
+    def exempt(self, request):
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        return self.get_response(request)
\ No newline at end of file
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Gives api.db_router.PrimaryReplicaRouter the request it routes for, and pins a client to
+    the primary after a request that wrote (or used an unsafe method), so it reads its own
+    writes. Runs natively in both sync and async stacks: the routing state must be set in the
+    context the views run in.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        state = RoutingState(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            pin_client(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        state = RoutingState(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            await sync_to_async(pin_client)(request, response)
+        return response
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+PATH_WIDTH = 10
+
+
+def backfill_comment_paths(apps, schema_editor):
+    Comment = apps.get_model('api', 'Comment')
+    paths = {}
+    level = list(Comment.objects.filter(parent__isnull=True).values_list('id', flat=True))
+    depth = 0
+    while level:
+        batch = []
+        for comment in Comment.objects.filter(id__in=level).only('id', 'parent_id'):
+            comment.path = f"{paths.get(comment.parent_id, '')}{comment.id:0{PATH_WIDTH}d}/"
+            comment.depth = depth
+            paths[comment.id] = comment.path
+            batch.append(comment)
+        Comment.objects.bulk_update(batch, ['path', 'depth'], batch_size=500)
+        level = list(Comment.objects.filter(parent_id__in=level).values_list('id', flat=True))
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alter_article_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['path'], name='comment_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'path'], name='comment_article_path_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:51
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+BACKFILL_SEARCH_VECTOR = """
+UPDATE api_article a SET search_vector =
+    setweight(to_tsvector('english', coalesce(a.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(c.name, ' ') FROM api_article_categories ac
+        JOIN api_category c ON c.id = ac.category_id WHERE ac.article_id = a.id), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(t.name, ' ') FROM api_article_tags at
+        JOIN api_tag t ON t.id = at.tag_id WHERE at.article_id = a.id), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(a.content, '')), 'C');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_comment_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTOR, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='article_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='article_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_activitylog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLogDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('action_type', models.CharField(choices=[('USER_REGISTERED', 'User Registered'), ('USER_UPDATED', 'User Updated'), ('USER_DELETED', 'User Deleted'), ('ARTICLE_CREATED', 'Article Created'), ('ARTICLE_UPDATED', 'Article Updated'), ('ARTICLE_DELETED', 'Article Deleted'), ('COMMENT_CREATED', 'Comment Created'), ('COMMENT_UPDATED', 'Comment Updated'), ('COMMENT_DELETED', 'Comment Deleted')], max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_daily', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Activity',
+                'verbose_name_plural': 'Daily Activity',
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'user', 'action_type'), name='activity_daily_unique', nulls_distinct=False)],
+            },
+        ),
+    ]
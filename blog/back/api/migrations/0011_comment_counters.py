@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+BACKFILL_COUNTERS = """
+UPDATE api_article a SET comment_count = (SELECT count(*) FROM api_comment c WHERE c.article_id = a.id);
+UPDATE api_comment p SET reply_count = (SELECT count(*) FROM api_comment c WHERE c.parent_id = p.id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_activitylogdaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_COUNTERS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_counters(apps, schema_editor):
+    SiteCounter = apps.get_model('api', 'SiteCounter')
+    DailyCounter = apps.get_model('api', 'DailyCounter')
+    tracked = {
+        'users': (apps.get_model(settings.AUTH_USER_MODEL), 'date_joined'),
+        'articles': (apps.get_model('api', 'Article'), 'created_at'),
+        'comments': (apps.get_model('api', 'Comment'), 'created_at'),
+    }
+    for name, (model, created_field) in tracked.items():
+        SiteCounter.objects.create(name=name, value=model.objects.count())
+        rows = model.objects.annotate(day=TruncDate(created_field)).values('day').annotate(n=Count('pk')).order_by()
+        DailyCounter.objects.bulk_create(DailyCounter(name=name, day=row['day'], value=row['n']) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_comment_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('name', models.CharField(max_length=50)),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'name'), name='daily_counter_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
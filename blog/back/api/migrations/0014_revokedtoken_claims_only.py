@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revokedtoken',
+            name='claims_only',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_comment_path_text'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailycounter',
+            name='daily_counter_unique',
+        ),
+        migrations.AddField(
+            model_name='dailycounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sitecounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='sitecounter',
+            name='name',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycounter',
+            constraint=models.UniqueConstraint(fields=('day', 'name', 'shard'), name='daily_counter_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='sitecounter',
+            constraint=models.UniqueConstraint(fields=('name', 'shard'), name='site_counter_unique'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:40
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_system_duplicates(apps, schema_editor):
+    # Servers before PostgreSQL 15 skipped the nulls_distinct=False constraint, so rows without
+    # a user may repeat a (day, action_type); fold them into one before the index is built
+    ActivityLogDaily = apps.get_model('api', 'ActivityLogDaily')
+    groups = (
+        ActivityLogDaily.objects.filter(user__isnull=True)
+        .values('day', 'action_type')
+        .annotate(rows=Count('id'), total=Sum('count'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in groups:
+        rows = ActivityLogDaily.objects.filter(user__isnull=True, day=group['day'], action_type=group['action_type'])
+        keep = rows.order_by('id').first()
+        rows.exclude(id=keep.id).delete()
+        ActivityLogDaily.objects.filter(id=keep.id).update(count=group['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_site_counter_shards'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='activitylogdaily',
+            name='activity_daily_unique',
+        ),
+        migrations.RunPython(merge_system_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='activitylogdaily',
+            constraint=models.UniqueConstraint(models.F('day'), django.db.models.functions.comparison.Coalesce('user', models.Value(0)), models.F('action_type'), name='activity_daily_unique'),
+        ),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, Greatest, Substr
 from django.contrib.auth.models import User
-from django.utils.text import slugify
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.dispatch import receiver
+from api.signals import bulk_saved, bulk_deleted
 import logging
 from django.utils import timezone
 from django.conf import settings
@@ -15,6 +20,17 @@ USER_TYPES = (
     ('admin', 'Administrator'),
 )
 
+def _update_fields_excluding(instance, maintained):
+    """
+    Loaded, concrete field names minus columns kept up to date by UPDATE ... SET x = x + 1 style
+    writes elsewhere, so that saving a stale instance never overwrites them.
+    """
+    deferred = instance.get_deferred_fields()
+    return [
+        f.name for f in instance._meta.concrete_fields
+        if not f.primary_key and f.attname not in deferred and f.name not in maintained
+    ]
+
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(null=True, blank=True)
@@ -23,9 +39,11 @@ class Category(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            from api.slugs import save_with_slug
+            save_with_slug(self, self.name, lambda: super(Category, self).save(*args, **kwargs))
 
     def __str__(self):
         return self.name
@@ -39,9 +57,11 @@ class Tag(models.Model):
     slug = models.SlugField(max_length=100, unique=True, blank=True)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            from api.slugs import save_with_slug
+            save_with_slug(self, self.name, lambda: super(Tag, self).save(*args, **kwargs))
 
     def __str__(self):
         return self.name
@@ -58,40 +78,154 @@ class Article(models.Model):
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title/categories/tags/content vector, maintained by api.search.refresh_search_vectors
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Maintained with F() updates by the Comment signal receivers; see `manage.py recount_comments`
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    MAINTAINED_FIELDS = ('search_vector', 'comment_count')
+    # Path segments next to articles/<slug>/ that a slug must not shadow
+    RESERVED_SLUGS = ('bulk', 'search')
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = _update_fields_excluding(self, self.MAINTAINED_FIELDS)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            from api.slugs import save_with_slug
+            save_with_slug(self, self.title, lambda: super(Article, self).save(*args, **kwargs))
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='article_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='article_search_vector_idx'),
+            GinIndex(fields=['title'], name='article_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+COMMENT_PATH_WIDTH = 10
+# Deepest reply accepted (the root is depth 0). Each level adds COMMENT_PATH_WIDTH + 1 characters
+# to the path, and a btree index entry has to stay under ~2.7 kB.
+COMMENT_MAX_DEPTH = 100
 
 class Comment(models.Model):
     article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
     content = models.TextField()
+    # Materialized path: zero-padded ids from the root down to this comment, e.g. "0000000003/0000000007/".
+    # Sorting by path gives the thread in display order; a prefix match gives a whole subtree.
+    path = models.TextField(blank=True, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Direct replies, maintained with F() updates like Article.comment_count
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['path'], name='comment_path_idx', opclasses=['text_pattern_ops']),
+            models.Index(fields=['article', 'path'], name='comment_article_path_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.username} on {self.article.title}"
 
+    def _expected_path(self):
+        parent_path = self.parent.path if self.parent_id else ''
+        return f"{parent_path}{self.pk:0{COMMENT_PATH_WIDTH}d}/"
+
+    def check_parent(self):
+        """A reply stays in its parent's article, and a comment cannot move under its own subtree."""
+        if not self.parent_id:
+            return
+        if self.parent.article_id != self.article_id:
+            raise ValidationError("Parent comment must belong to the same article")
+        if self.path and (self.parent_id == self.pk or self.parent.path.startswith(self.path)):
+            raise ValidationError("A comment cannot be moved under one of its own replies")
+
+    def save(self, *args, **kwargs):
+        self.check_parent()
+        self.depth = self.parent.depth + 1 if self.parent_id else 0
+        if self._state.adding and self.pk is None:
+            # Take the id from the sequence first, so the row is inserted with its final path
+            self.pk = _next_id(Comment)
+            self.path = self._expected_path()
+            kwargs['force_insert'] = True
+            super().save(*args, **kwargs)
+            return
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = _update_fields_excluding(self, ('reply_count',))
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._move_subtree()
+
+    def _move_subtree(self):
+        expected = self._expected_path()
+        if self.path == expected:
+            return
+        old_path = self.path
+        self.path = expected
+        if old_path:
+            # Re-parented: move the rest of the subtree in one UPDATE
+            Comment.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(expected), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (expected.count('/') - old_path.count('/')),
+            )
+            old_segments = old_path.rstrip('/').split('/')
+            if len(old_segments) > 1:
+                _adjust_counter(Comment, int(old_segments[-2]), 'reply_count', -1)
+            if self.parent_id:
+                _adjust_counter(Comment, self.parent_id, 'reply_count', 1)
+        Comment.objects.filter(pk=self.pk).update(path=expected)
+
+    def descendants(self):
+        if not self.path:
+            return Comment.objects.none()
+        return Comment.objects.filter(path__startswith=self.path, depth__gt=self.depth)
+
     def delete(self, *args, **kwargs):
+        comment_id = self.id
         try:
-            logger.info(f"Deleting comment ID: {self.id} by user: {self.author.username}")
             super().delete(*args, **kwargs)
-            logger.info(f"Comment ID: {self.id} deleted successfully")
-        except Exception as e:
-            logger.error(f"Error deleting comment ID: {self.id}: {str(e)}")
+        except Exception:
+            logger.exception("Error deleting comment %s", comment_id)
             raise
+        logger.debug("Comment %s deleted", comment_id)
+
+def _next_id(model):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s))", [model._meta.db_table, model._meta.pk.column])
+        return cursor.fetchone()[0]
+
+def _adjust_counter(model, pk, field, delta):
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+@receiver(post_save, sender=Comment)
+def increment_comment_counters(sender, instance, created, **kwargs):
+    if not created:
+        return
+    _adjust_counter(Article, instance.article_id, 'comment_count', 1)
+    if instance.parent_id:
+        _adjust_counter(Comment, instance.parent_id, 'reply_count', 1)
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_counters(sender, instance, origin=None, **kwargs):
+    # Comments cascading from deleted articles: the article and every parent go in the same
+    # operation, so there is nothing left to update
+    if isinstance(origin, Article) or (isinstance(origin, models.QuerySet) and origin.model is Article):
+        return
+    # Also runs for every reply removed by CASCADE; updates to rows deleted in the same
+    # operation simply match nothing.
+    _adjust_counter(Article, instance.article_id, 'comment_count', -1)
+    if instance.parent_id:
+        _adjust_counter(Comment, instance.parent_id, 'reply_count', -1)
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -113,18 +247,6 @@ def create_user_profile(sender, instance, created, **kwargs):
             bio=""
         )
 
-@receiver(pre_delete, sender=Comment)
-def log_comment_deletion(sender, instance, **kwargs):
-    try:
-        article_info = f"{instance.article.title} (ID: {instance.article.id})" if instance.article else "No article"
-        author_info = f"{instance.author.username} (ID: {instance.author.id})" if instance.author else "No author"
-        logger.info(f"PRE-DELETE COMMENT SIGNAL - Comment ID: {instance.id}")
-        logger.info(f"  - Comment content: {instance.content[:50]}...")
-        logger.info(f"  - Article: {article_info}")
-        logger.info(f"  - Author: {author_info}")
-    except Exception as e:
-        logger.error(f"Error in pre_delete signal for comment {instance.id}: {str(e)}")
-
 class ActivityLog(models.Model):
     ACTION_TYPES = [
         ('USER_REGISTERED', 'User Registered'),
@@ -151,16 +273,91 @@ class ActivityLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Activity Log'
         verbose_name_plural = 'Activity Logs'
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='activity_time_idx'),
+            models.Index(fields=['user', '-timestamp', '-id'], name='activity_user_time_idx'),
+            models.Index(fields=['action_type', '-timestamp', '-id'], name='activity_action_time_idx'),
+        ]
+
+class ActivityLogDaily(models.Model):
+    """Per-day ActivityLog counts; raw rows older than the retention window are rolled up into this."""
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_daily')
+    action_type = models.CharField(max_length=50, choices=ActivityLog.ACTION_TYPES)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        user_str = self.user.username if self.user else "System"
+        return f"{user_str} - {self.get_action_type_display()} x{self.count} on {self.day}"
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name = 'Daily Activity'
+        verbose_name_plural = 'Daily Activity'
+        constraints = [
+            # COALESCE so system rows (no user) are unique too; nulls_distinct=False needs PostgreSQL 15
+            models.UniqueConstraint(
+                F('day'), Coalesce('user', Value(0)), F('action_type'),
+                name='activity_daily_unique',
+            ),
+        ]
+
+class SiteCounter(models.Model):
+    """
+    Running totals kept by api.stats from model signals; `manage.py reconcile_stats` fixes drift.
+    A total is the sum of its shard rows, so concurrent writers rarely update the same row.
+    """
+    name = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}] = {self.value}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'shard'], name='site_counter_unique'),
+        ]
+
+class DailyCounter(models.Model):
+    """Per-day event counts (registrations, articles, comments) for the admin dashboard trends."""
+    day = models.DateField()
+    name = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.name}[{self.shard}] = {self.value}"
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'name', 'shard'], name='daily_counter_unique'),
+        ]
+
+class RevokedToken(models.Model):
+    """
+    Revoked JWTs, mirrored in memory by api.revocation. A row with a jti revokes that one token;
+    a row without one revokes every token issued to `user` up to revoked_at (forced sign-out),
+    or with claims_only set, just the permission snapshot those tokens carry.
+    Rows are pointless once expires_at has passed.
+    """
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    claims_only = models.BooleanField(default=False)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        scope = 'claims of' if self.claims_only else 'all tokens of'
+        return f"{self.jti or f'{scope} user {self.user_id}'} revoked at {self.revoked_at}"
 
 def log_activity(user, action_type, details=""):
+    from api.activity import activity_sink
     try:
-        ActivityLog.objects.create(
-            user=user, 
-            action_type=action_type, 
-            details=details
-        )
+        activity_sink.record(user, action_type, details)
     except Exception as e:
-        logger.error(f"Failed to create activity log for action {action_type}: {str(e)}")
+        logger.error("Failed to create activity log for action %s: %s", action_type, e)
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def log_user_save(sender, instance, created, **kwargs):
@@ -198,17 +395,83 @@ def log_comment_save(sender, instance, created, **kwargs):
 
 @receiver(pre_delete, sender=Comment)
 def log_comment_deletion_activity(sender, instance, **kwargs):
-    try:
-        article_info = f"{instance.article.title} (ID: {instance.article.id})" if instance.article else "No article"
-        author_info = f"{instance.author.username} (ID: {instance.author.id})" if instance.author else "No author"
-        
-        logger.info(f"PRE-DELETE COMMENT SIGNAL - Comment ID: {instance.id}")
-        logger.info(f"  - Comment content: {instance.content[:50]}...")
-        logger.info(f"  - Article: {article_info}")
-        logger.info(f"  - Author: {author_info}")
-    except Exception as e:
-        logger.error(f"Error in pre_delete signal (logger part) for comment {instance.id}: {str(e)}")
-
+    logger.info(
+        "Deleting comment %s on article %s by user %s: %.50s",
+        instance.id, instance.article_id, instance.author_id, instance.content,
+        extra={'comment_id': instance.id, 'article_id': instance.article_id, 'user_id': instance.author_id},
+    )
+    from api.activity import activity_suppressed
+    if activity_suppressed('COMMENT_DELETED'):
+        # Covered by a bulk delete's summary entry: skip the author and article lookups
+        return
     user = instance.author
     details = f"Comment (ID: {instance.id}) on article '{instance.article.title}' by {user.username}"
     log_activity(user, 'COMMENT_DELETED', details)
+
+@receiver(post_save, sender=Article)
+def update_article_search_vector(sender, instance, **kwargs):
+    from api.search import refresh_search_vectors
+    refresh_search_vectors([instance.pk])
+
+@receiver(m2m_changed, sender=Article.categories.through)
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_article_search_vector_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # pk_set is None on clear, so remember which articles are about to lose this category/tag
+        instance._search_vector_article_ids = list(instance.articles.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from api.search import refresh_search_vectors
+    if not reverse:
+        refresh_search_vectors([instance.pk])
+    elif action == 'post_clear':
+        refresh_search_vectors(getattr(instance, '_search_vector_article_ids', []))
+    else:
+        refresh_search_vectors(pk_set)
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def update_search_vectors_on_rename(sender, instance, created, **kwargs):
+    if created:
+        return
+    from api.search import refresh_search_vectors
+    refresh_search_vectors(instance.articles.values_list('pk', flat=True))
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def remember_articles_of_deleted_relation(sender, instance, **kwargs):
+    # The through rows cascade away without m2m_changed; bulk deletes go through here per row too
+    instance._search_vector_article_ids = list(instance.articles.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def update_search_vectors_on_relation_delete(sender, instance, **kwargs):
+    from api.search import refresh_search_vectors
+    refresh_search_vectors(getattr(instance, '_search_vector_article_ids', []))
+
+@receiver(bulk_saved, sender=Article)
+def bulk_article_save(sender, instances, created, user=None, **kwargs):
+    if not instances:
+        return
+    from api.search import refresh_search_vectors
+    refresh_search_vectors([instance.pk for instance in instances])
+    action = 'ARTICLE_CREATED' if created else 'ARTICLE_UPDATED'
+    ids = ', '.join(str(instance.pk) for instance in instances)
+    log_activity(user, action, f"{len(instances)} articles {'created' if created else 'updated'} in bulk (IDs: {ids})")
+
+@receiver(bulk_deleted, sender=Article)
+def bulk_article_delete(sender, ids, user=None, **kwargs):
+    if ids:
+        log_activity(user, 'ARTICLE_DELETED', f"{len(ids)} articles deleted in bulk (IDs: {', '.join(map(str, ids))})")
+
+@receiver(bulk_saved, sender=Category)
+@receiver(bulk_saved, sender=Tag)
+def update_search_vectors_on_bulk_rename(sender, instances, created, **kwargs):
+    if created or not instances:
+        return
+    from api.search import refresh_search_vectors
+    relation = 'categories' if sender is Category else 'tags'
+    refresh_search_vectors(
+        Article.objects.filter(**{f'{relation}__in': [instance.pk for instance in instances]}).values_list('pk', flat=True)
+    )
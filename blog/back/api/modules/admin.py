@@ -1,27 +1,113 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from api.models import User, Article, Comment
+from api.models import ActivityLog
+from api.pagination import ActivityLogPagination
+from api.serializers import ActivityLogSerializer
+from api.caching import cache_stats
+from api.db_pool import pool_stats
+from api.stats import daily_series, site_totals
+from api.transfer import aiter_sync, export_records, iter_ndjson
 
 class SiteStatisticsView(APIView):
+    """Totals from the precomputed counters; ?days=N (max 365) adds per-day series."""
     permission_classes = [IsAdminUser]
 
     def get(self, request, *args, **kwargs):
+        totals = site_totals()
         stats = {
-            'total_users': User.objects.count(),
-            'total_articles': Article.objects.count(),
-            'total_comments': Comment.objects.count(),
+            'total_users': totals['users'],
+            'total_articles': totals['articles'],
+            'total_comments': totals['comments'],
         }
+        days = request.query_params.get('days')
+        if days:
+            if not days.isdigit() or not 1 <= int(days) <= 365:
+                raise ValidationError({'days': 'Expected a number of days between 1 and 365.'})
+            series = daily_series(int(days))
+            stats['trends'] = {
+                'registrations': series['users'],
+                'articles': series['articles'],
+                'comments': series['comments'],
+            }
         return Response(stats)
 
-class ActivityLogListView(APIView):
+class CacheStatsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request, *args, **kwargs):
-        # This is a placeholder for the actual activity log retrieval logic
-        # You would typically query your database or log files to get this data
-        activity_logs = [
-            {'user': 'admin', 'action': 'created article', 'timestamp': '2023-10-01 12:00:00'},
-            {'user': 'user1', 'action': 'commented on article', 'timestamp': '2023-10-02 14:30:00'},
-        ]
-        return Response(activity_logs)
\ No newline at end of file
+        return Response(cache_stats())
+
+class DatabasePoolStatsView(APIView):
+    """Connection reuse counters of the worker process that answers; see api.db_pool."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(pool_stats())
+
+class ActivityLogListView(generics.ListAPIView):
+    """
+    Activity feed, newest first, cursor-paginated on (timestamp, id).
+    Filters: ?user=<id>, ?action_type=A[,B...], ?since=<iso datetime>, ?until=<iso datetime>.
+    """
+    serializer_class = ActivityLogSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ActivityLogPagination
+
+    def _parse_time(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError({name: 'Expected an ISO 8601 datetime.'})
+        return parsed
+
+    def get_queryset(self):
+        queryset = ActivityLog.objects.select_related('user')
+        params = self.request.query_params
+
+        user = params.get('user')
+        if user:
+            if not user.isdigit():
+                raise ValidationError({'user': 'Expected a user id.'})
+            queryset = queryset.filter(user_id=int(user))
+
+        action_types = [a for a in params.get('action_type', '').split(',') if a]
+        if action_types:
+            valid = dict(ActivityLog.ACTION_TYPES)
+            unknown = [a for a in action_types if a not in valid]
+            if unknown:
+                raise ValidationError({'action_type': f"Unknown action type(s): {', '.join(unknown)}"})
+            queryset = queryset.filter(action_type__in=action_types)
+
+        since = self._parse_time('since')
+        if since:
+            queryset = queryset.filter(timestamp__gte=since)
+        until = self._parse_time('until')
+        if until:
+            queryset = queryset.filter(timestamp__lt=until)
+        return queryset
+
+class ExportView(APIView):
+    """
+    The whole blog as NDJSON (see api.transfer), streamed while it is read. ?passwords=true
+    includes password hashes, so users can sign in after an import.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        include_passwords = request.query_params.get('passwords', '').lower() in ('1', 'true', 'yes')
+        content = iter_ndjson(export_records(include_passwords=include_passwords))
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_sync(content)
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        filename = f"blog-export-{timezone.now():%Y%m%d-%H%M%S}.ndjson"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,46 +1,88 @@
-from venv import logger
 from rest_framework import generics, viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 from api.models import Article, Comment
 from api.serializers import ArticleSerializer, CommentSerializer
 from api.permissions import IsAuthorOrReadOnly
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework.response import Response
+from api.comment_tree import load_comment_tree
+from api.search import search_articles
+from api.pagination import ArticlePagination
+from api.caching import CachedArticleDetailMixin
+from api.claims import request_is_staff
+from api.slugs import article_slugs
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ArticleListCreateView(generics.ListCreateAPIView):
     queryset = Article.objects.select_related('author').prefetch_related('categories', 'tags').all()
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthorOrReadOnly]
+    pagination_class = ArticlePagination
+
+    def get_queryset(self):
+        return ArticleSerializer.project_queryset(super().get_queryset(), self.request)
 
     def perform_create(self, serializer):
-        if self.request.user.is_staff and 'author' in self.request.data:
+        if request_is_staff(self.request) and 'author' in self.request.data:
             author = User.objects.get(pk=self.request.data['author'])
             serializer.save(author=author)
         else:
             serializer.save(author=self.request.user)
 
-class ArticleDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Article.objects.all()
+class ArticleDetailView(CachedArticleDetailMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Article.objects.select_related('author').prefetch_related('categories', 'tags')
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthorOrReadOnly]
 
+    def get_queryset(self):
+        return ArticleSerializer.project_queryset(super().get_queryset(), self.request)
+
+class ArticleSlugMixin:
+    """
+    Article routes addressed by slug: the slug is resolved to the id (through article_slugs,
+    usually without a query) before the handler runs, and the id-based view does the rest.
+    """
+    slug_target_kwarg = 'pk'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.kwargs[self.slug_target_kwarg] = self.resolve_slug(refresh=False)
+
+    def resolve_slug(self, refresh):
+        pk = article_slugs.resolve(self.kwargs['slug'], refresh=refresh)
+        if pk is None:
+            raise Http404('No Article matches the given query.')
+        return pk
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # The remembered id may belong to an article another worker has deleted since
+            pk = self.resolve_slug(refresh=True)
+            if pk == self.kwargs[self.slug_target_kwarg]:
+                raise
+            self.kwargs[self.slug_target_kwarg] = pk
+            return super().get_object()
+
+class ArticleSlugDetailView(ArticleSlugMixin, ArticleDetailView):
+    pass
+
 class ArticleSearchView(generics.ListAPIView):
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        queryset = Article.objects.all()
+        queryset = Article.objects.select_related('author').prefetch_related('categories', 'tags')
         query = self.request.query_params.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(categories__name__icontains=query) |
-                Q(tags__name__icontains=query)
-            ).distinct()
-        return queryset
+            queryset = search_articles(queryset, query)
+        return ArticleSerializer.project_queryset(queryset, self.request)
 
 class ArticleCommentView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
@@ -50,14 +92,25 @@ class ArticleCommentView(generics.ListCreateAPIView):
         article_id = self.kwargs['article_id']
         return Comment.objects.filter(article_id=article_id, parent__isnull=True)
 
+    def list(self, request, *args, **kwargs):
+        tree = load_comment_tree(self.kwargs['article_id'], request)
+        context = self.get_serializer_context()
+        context['comment_tree'] = tree
+        serializer = self.get_serializer(tree.roots, many=True, context=context)
+        return Response(serializer.data)
+
     def perform_create(self, serializer):
         article_id = self.kwargs['article_id']
         article = get_object_or_404(Article, pk=article_id)
         serializer.save(author=self.request.user, article=article)
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleSlugCommentView(ArticleSlugMixin, ArticleCommentView):
+    slug_target_kwarg = 'article_id'
+
+class ArticleViewSet(CachedArticleDetailMixin, viewsets.ModelViewSet):
     queryset = Article.objects.select_related('author').prefetch_related('categories', 'tags').all()
     serializer_class = ArticleSerializer
+    pagination_class = ArticlePagination
     # Apply IsAuthorOrReadOnly for standard operations, allow admins full access
     permission_classes = [IsAuthorOrReadOnly | IsAdminUser] 
 
@@ -67,19 +120,19 @@ class ArticleViewSet(viewsets.ModelViewSet):
         Admins can do anything. Authors can modify/delete their own articles.
         Read is allowed for anyone (handled by IsAuthorOrReadOnly).
         """
-        if self.request.user and self.request.user.is_staff:
+        if request_is_staff(self.request):
             return [IsAdminUser()] # Admins bypass other checks
         return [IsAuthorOrReadOnly()] # Default check for non-admins
 
     def get_queryset(self):
         try:
-            return super().get_queryset()
+            return ArticleSerializer.project_queryset(super().get_queryset(), self.request)
         except Exception as e:
-            logger.error(f"Error in ArticleViewSet.get_queryset: {str(e)}")
+            logger.error("Error in ArticleViewSet.get_queryset: %s", e)
             return Article.objects.none()
 
     def perform_create(self, serializer):
-        if self.request.user.is_staff and 'author' in self.request.data:
+        if request_is_staff(self.request) and 'author' in self.request.data:
             try:
                 author = User.objects.get(pk=self.request.data['author'])
                 serializer.save(author=author)
@@ -0,0 +1,227 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+from api.caching import (
+    aarticle_updated_at, aget_generations, arecord_cache_event, article_detail_cache_key, article_detail_entry,
+    article_detail_generation_names, article_detail_response, article_detail_variant, article_validators,
+    generation_cache_key, not_modified_response, response_cache_enabled, set_validators,
+)
+from api.claims import get_permission_snapshot
+from api.comment_tree import aload_comment_tree
+from api.models import Article, Category, Tag
+from api.pagination import ArticlePagination
+from api.serializers import ArticleSerializer, CategorySerializer, CommentSerializer, TagSerializer
+from api.slugs import article_slugs
+
+
+class AsyncReadView(View):
+    """
+    GET endpoint that runs natively under ASGI: queries go through the async ORM and nothing
+    holds a worker thread while the database or the client is slow. Output, caching and error
+    bodies match the DRF view serving the same route, which handles every other method (see
+    read_or_write()).
+
+    Only a request that carries credentials is authenticated, and then in one hop to a thread
+    (token checks and the role snapshot can need the database); anonymous reads stay on the
+    event loop throughout.
+    """
+    http_method_names = ['get', 'head']
+    renderer = JSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            drf_request = await self.initialize_request(request)
+            response = await self.read(drf_request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = self.handle_exception(request, exc)
+        return self.finalize_response(response)
+
+    async def read(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_authenticators(self):
+        return [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    async def initialize_request(self, request):
+        drf_request = Request(request, authenticators=self.get_authenticators())
+        if 'HTTP_AUTHORIZATION' in request.META:
+            await sync_to_async(self.authenticate)(drf_request)
+        else:
+            drf_request.user, drf_request.auth = AnonymousUser(), None
+        return drf_request
+
+    def authenticate(self, request):
+        if request.user.is_authenticated:
+            get_permission_snapshot(request)
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            authenticators = self.get_authenticators()
+            header = authenticators[0].authenticate_header(request) if authenticators else None
+            if header:
+                exc.auth_header = header
+            else:
+                exc.status_code = 403
+        return exception_handler(exc, {'view': self, 'request': request})
+
+    def finalize_response(self, response):
+        if isinstance(response, Response):
+            response.accepted_renderer = self.renderer
+            response.accepted_media_type = self.renderer.media_type
+            response.renderer_context = {}
+            response.render()
+        return response
+
+
+class AsyncArticleListView(AsyncReadView):
+    """GET articles/: same projection and keyset pagination as ArticleListCreateView."""
+    async def read(self, request):
+        queryset = ArticleSerializer.project_queryset(
+            Article.objects.select_related('author').prefetch_related('categories', 'tags'), request)
+        paginator = ArticlePagination()
+        page = await paginator.apaginate_queryset(queryset, request)
+        serializer = ArticleSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AsyncArticleDetailView(AsyncReadView):
+    """GET articles/<id>/ and articles/<slug>/, sharing ArticleDetailView's cache entries."""
+    async def read(self, request, pk=None, slug=None):
+        if slug is not None:
+            pk = await self.resolve_slug(slug)
+        pk = str(pk)
+        if not response_cache_enabled():
+            return await self.conditional_read(request, pk, slug)
+        generations = await aget_generations(article_detail_generation_names(pk))
+        key = article_detail_cache_key(pk, generations, article_detail_variant(ArticleSerializer, request))
+        entry = await cache.aget(key)
+        if entry is None:
+            await arecord_cache_event('article', 'miss')
+            instance = await self.load(request, pk, slug)
+            entry = article_detail_entry(key, instance, ArticleSerializer(instance, context={'request': request}).data)
+            await cache.aset(key, entry, getattr(settings, 'ARTICLE_CACHE_TIMEOUT', 300))
+        else:
+            await arecord_cache_event('article', 'hit')
+        return article_detail_response(request, entry)
+
+    async def conditional_read(self, request, pk, slug=None):
+        """Like CachedArticleDetailMixin with the cache off: validators from updated_at, 304 before loading."""
+        instance = None
+        updated_at = await aarticle_updated_at(pk)
+        if updated_at is None:
+            instance = await self.load(request, pk, slug)
+            pk, updated_at = instance.pk, instance.updated_at
+        validators = article_validators(pk, article_detail_variant(ArticleSerializer, request), updated_at)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return set_validators(not_modified, validators)
+        if instance is None:
+            instance = await self.load(request, pk, slug)
+        return set_validators(Response(ArticleSerializer(instance, context={'request': request}).data), validators)
+
+    async def load(self, request, pk, slug=None):
+        instance = await self.get_object(request, pk)
+        if instance is None and slug is not None:
+            # The remembered id may belong to an article another worker has deleted since
+            instance = await self.get_object(request, await self.resolve_slug(slug, refresh=True))
+        if instance is None:
+            raise Http404('No Article matches the given query.')
+        return instance
+
+    async def resolve_slug(self, slug, refresh=False):
+        pk = await sync_to_async(article_slugs.resolve)(slug, refresh=refresh)
+        if pk is None:
+            raise Http404('No Article matches the given query.')
+        return pk
+
+    async def get_object(self, request, pk):
+        queryset = ArticleSerializer.project_queryset(
+            Article.objects.select_related('author').prefetch_related('categories', 'tags'), request)
+        return await queryset.filter(pk=pk).afirst()
+
+
+class AsyncArticleCommentView(AsyncReadView):
+    """GET articles/<id>/comments/ and articles/<slug>/comments/: the article's comment tree."""
+    async def read(self, request, article_id=None, slug=None):
+        if slug is not None:
+            article_id = await sync_to_async(article_slugs.resolve)(slug)
+            if article_id is None:
+                raise Http404('No Article matches the given query.')
+        tree = await aload_comment_tree(article_id, request)
+        serializer = CommentSerializer(tree.roots, many=True, context={'request': request, 'comment_tree': tree})
+        return Response(serializer.data)
+
+
+class AsyncGenerationCachedView(AsyncReadView):
+    """List or detail (with pk) of a small model, cached like GenerationCachedMixin does it."""
+    cache_generation = None
+    model = None
+    serializer_class = None
+
+    async def read(self, request, pk=None):
+        if not response_cache_enabled():
+            return Response(await self.load(request, pk))
+        [generation] = await aget_generations([self.cache_generation])
+        key = generation_cache_key(self.cache_generation, generation, 'list' if pk is None else f'detail:{pk}')
+        data = await cache.aget(key)
+        if data is not None:
+            await arecord_cache_event(self.cache_generation, 'hit')
+            return Response(data)
+
+        await arecord_cache_event(self.cache_generation, 'miss')
+        data = await self.load(request, pk)
+        await cache.aset(key, data, getattr(settings, 'TAXONOMY_CACHE_TIMEOUT', 3600))
+        return Response(data)
+
+    async def load(self, request, pk):
+        context = {'request': request}
+        if pk is None:
+            objects = [obj async for obj in self.model.objects.all()]
+            return list(self.serializer_class(objects, many=True, context=context).data)
+        obj = await self.model.objects.filter(pk=pk).afirst()
+        if obj is None:
+            raise Http404(f'No {self.model._meta.object_name} matches the given query.')
+        return dict(self.serializer_class(obj, context=context).data)
+
+
+class AsyncCategoryView(AsyncGenerationCachedView):
+    cache_generation = 'category'
+    model = Category
+    serializer_class = CategorySerializer
+
+
+class AsyncTagView(AsyncGenerationCachedView):
+    cache_generation = 'tag'
+    model = Tag
+    serializer_class = TagSerializer
+
+
+def read_or_write(async_view, sync_view):
+    """
+    URL callback for a route with an async read view: with ASYNC_READ_VIEWS on (the default
+    under asgi.py), GET and HEAD go to `async_view` and other methods to the DRF view, run in a
+    thread as Django would run it anyway. Otherwise the DRF view serves everything, so WSGI
+    deployments see no change.
+    """
+    sync_callback = sync_view.as_view()
+    if not getattr(settings, 'ASYNC_READ_VIEWS', False):
+        return sync_callback
+    async_callback = async_view.as_view()
+    write_callback = sync_to_async(sync_callback)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_callback(request, *args, **kwargs)
+        return await write_callback(request, *args, **kwargs)
+
+    view.csrf_exempt = getattr(sync_callback, 'csrf_exempt', False)
+    return view
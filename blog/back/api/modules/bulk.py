@@ -0,0 +1,329 @@
+import logging
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from api.activity import suppress_activity
+from api.claims import request_is_staff
+from api.models import Article, Category, Tag, User
+from api.serializers import BulkArticleSerializer, BulkCategorySerializer, BulkTagSerializer
+from api.signals import bulk_saved, bulk_deleted
+from api.slugs import allocate_slugs, lock_slug_bases
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _add_error(errors, index, field, message):
+    errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+
+class BulkWriteView(APIView):
+    """
+    POST creates, PATCH updates and DELETE removes a batch of objects.
+
+    POST and PATCH take a JSON array of objects (PATCH items carry their "id"); DELETE takes
+    {"ids": [...]}. Items are validated one by one, then checks that span the batch (uniqueness,
+    referenced rows) run as one query each. The valid items are written with bulk_create /
+    bulk_update in one transaction; once it has committed, bulk_saved / bulk_deleted bring search
+    vectors, caches, counters and the activity log up to date once for the whole batch.
+
+    Invalid items are reported by index and skipped. With ?atomic=true (default: BULK_ATOMIC)
+    any error rejects the whole batch and nothing is written.
+    """
+    permission_classes = [IsAuthenticated]
+    model = None
+    serializer_class = None
+    # Per-row ActivityLog entries replaced by the one bulk_deleted writes
+    delete_activity = ()
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def is_atomic(self, request):
+        value = request.query_params.get('atomic')
+        if value is None:
+            return getattr(settings, 'BULK_ATOMIC', False)
+        return value.lower() in TRUE_VALUES
+
+    def _check_size(self, items, field):
+        if not isinstance(items, list):
+            raise ValidationError({field: ['Expected a list.']})
+        max_items = getattr(settings, 'BULK_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            raise ValidationError({field: [f'At most {max_items} items per request.']})
+
+    def check_item_permission(self, request, instance):
+        return True
+
+    def validate_batch(self, request, valid, created, errors):
+        """Checks that need the whole batch; failures go into `errors` under the item's index."""
+
+    def create_objects(self, request, valid):
+        """Insert the valid items; returns (index, instance) pairs. Override for relations or derived fields."""
+        objects = [self.model(**data) for _, _, data in valid]
+        self.model.objects.bulk_create(objects)
+        return [(index, obj) for obj, (index, _, _) in zip(objects, valid)]
+
+    def update_objects(self, request, valid):
+        """Apply the validated fields to the loaded instances and write them in one bulk_update."""
+        fields = set()
+        for _, obj, data in valid:
+            for field, value in data.items():
+                setattr(obj, field, value)
+                fields.add(field)
+        if any(f.name == 'updated_at' for f in self.model._meta.concrete_fields):
+            now = timezone.now()
+            for _, obj, _ in valid:
+                obj.updated_at = now
+            fields.add('updated_at')
+        if fields:
+            self.model.objects.bulk_update([obj for _, obj, _ in valid], sorted(fields))
+        return [(index, obj) for index, obj, _ in valid]
+
+    def post(self, request, *args, **kwargs):
+        return self.save_batch(request, created=True)
+
+    def patch(self, request, *args, **kwargs):
+        return self.save_batch(request, created=False)
+
+    def _load_targets(self, request, ids, errors):
+        """(index, instance) for each id that exists, is not repeated and may be changed by the user."""
+        instances = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        targets, seen = [], set()
+        for index, pk in enumerate(ids):
+            instance = instances.get(pk)
+            if instance is None:
+                _add_error(errors, index, 'id', 'Not found.')
+            elif pk in seen:
+                _add_error(errors, index, 'id', 'Appears more than once in this batch.')
+            elif not self.check_item_permission(request, instance):
+                _add_error(errors, index, 'id', 'You do not have permission to change this object.')
+            else:
+                seen.add(pk)
+                targets.append((index, instance))
+        return targets
+
+    def save_batch(self, request, created):
+        items = request.data
+        self._check_size(items, 'non_field_errors')
+        errors = {}
+        if created:
+            targets = [(index, None) for index in range(len(items))]
+        else:
+            targets = self._load_targets(request, [_as_id(item.get('id')) if isinstance(item, dict) else None for item in items], errors)
+
+        valid = []
+        for index, instance in targets:
+            serializer = self.serializer_class(instance, data=items[index], partial=not created, context={'request': request})
+            if serializer.is_valid():
+                valid.append((index, instance, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        self.validate_batch(request, valid, created, errors)
+        valid = [entry for entry in valid if entry[0] not in errors]
+
+        if errors and (self.is_atomic(request) or not valid):
+            return self.batch_response([], errors, written=False)
+        try:
+            with transaction.atomic():
+                saved = self.create_objects(request, valid) if created else self.update_objects(request, valid)
+        except DatabaseError:
+            logger.exception("Bulk %s of %s rejected by the database", 'create' if created else 'update', self.model._meta.label)
+            return Response({'detail': 'Batch rejected by the database.'}, status=status.HTTP_400_BAD_REQUEST)
+        # After the commit: cache receivers must not let readers cache rows they cannot see yet
+        bulk_saved.send(sender=self.model, instances=[instance for _, instance in saved], created=created, user=request.user)
+        return self.batch_response([{'index': index, 'id': instance.pk} for index, instance in saved], errors, created=created)
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        self._check_size(ids, 'ids')
+        errors = {}
+        targets = self._load_targets(request, [_as_id(pk) for pk in ids], errors)
+        if errors and (self.is_atomic(request) or not targets):
+            return self.batch_response([], errors, written=False)
+
+        deleted_ids = [instance.pk for _, instance in targets]
+        try:
+            with transaction.atomic():
+                # Deleting through the queryset keeps cascades and per-row signals intact
+                with suppress_activity(*self.delete_activity):
+                    self.model.objects.filter(pk__in=deleted_ids).delete()
+        except DatabaseError:
+            logger.exception("Bulk delete of %s rejected by the database", self.model._meta.label)
+            return Response({'detail': 'Batch rejected by the database.'}, status=status.HTTP_400_BAD_REQUEST)
+        bulk_deleted.send(sender=self.model, ids=deleted_ids, user=request.user)
+        return self.batch_response([{'index': index, 'id': instance.pk} for index, instance in targets], errors)
+
+    def batch_response(self, results, errors, written=True, created=False):
+        body = {
+            'results': results,
+            'errors': [{'index': index, 'errors': item_errors} for index, item_errors in sorted(errors.items())],
+        }
+        if not written:
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+        if errors:
+            return Response(body, status=status.HTTP_207_MULTI_STATUS)
+        return Response(body, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def check_references(self, valid, errors, field, model, many=True):
+        """Every id referenced through `field` must exist: one IN query for the whole batch."""
+        def referenced(data):
+            if field not in data:
+                return []
+            return data[field] if many else [data[field]]
+
+        wanted = {pk for _, _, data in valid for pk in referenced(data)}
+        if not wanted:
+            return
+        found = set(model.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+        for index, _, data in valid:
+            for pk in referenced(data):
+                if pk not in found:
+                    _add_error(errors, index, field, f'Invalid pk "{pk}" - object does not exist.')
+
+    def check_unique(self, errors, field, values, error_field=None):
+        """
+        `values` maps item index -> (value, pk of the item or None). A value may not repeat within
+        the batch or belong to another existing row: one IN query for the whole batch.
+        """
+        by_value = {}
+        for index, (value, _) in values.items():
+            by_value.setdefault(value, []).append(index)
+        if not by_value:
+            return
+        owners = dict(self.model.objects.filter(**{f'{field}__in': by_value}).values_list(field, 'pk'))
+        name = self.model._meta.verbose_name
+        for value, indexes in by_value.items():
+            for position, index in enumerate(indexes):
+                owner = owners.get(value)
+                if position > 0 or (owner is not None and owner != values[index][1]):
+                    _add_error(errors, index, error_field or field, f'{name} with this {field} already exists.')
+
+    def set_relations(self, instances, field, values, replace):
+        """Write M2M rows for `field` straight into its through table, for all instances at once."""
+        relation = getattr(self.model, field)
+        through = relation.through
+        source = relation.field.m2m_field_name()
+        target = relation.field.m2m_reverse_field_name()
+        if replace:
+            through.objects.filter(**{f'{source}_id__in': [instance.pk for instance in instances]}).delete()
+        through.objects.bulk_create([
+            through(**{f'{source}_id': instance.pk, f'{target}_id': pk})
+            for instance, pks in zip(instances, values) for pk in set(pks)
+        ], ignore_conflicts=True)
+
+
+class ArticleBulkView(BulkWriteView):
+    model = Article
+    serializer_class = BulkArticleSerializer
+    delete_activity = ('ARTICLE_DELETED', 'COMMENT_DELETED')
+
+    def get_queryset(self):
+        return Article.objects.defer('search_vector')
+
+    def check_item_permission(self, request, instance):
+        return instance.author_id == request.user.id or request_is_staff(request)
+
+    def validate_batch(self, request, valid, created, errors):
+        self.check_references(valid, errors, 'categories', Category)
+        self.check_references(valid, errors, 'tags', Tag)
+        if request_is_staff(request):
+            self.check_references(valid, errors, 'author', User, many=False)
+
+    def _author_id(self, request, data, default):
+        # Like ArticleListCreateView: only staff may write on someone else's behalf
+        if 'author' in data and request_is_staff(request):
+            return data['author']
+        return default
+
+    def _set_relations(self, saved, replace):
+        for field in ('categories', 'tags'):
+            changed = [(instance, data[field]) for instance, data in saved if field in data]
+            if changed:
+                self.set_relations([instance for instance, _ in changed], field, [pks for _, pks in changed], replace)
+
+    def create_objects(self, request, valid):
+        titles = [data['title'] for _, _, data in valid]
+        # Held until the batch commits, so single saves of the same titles wait for our rows
+        lock_slug_bases(Article, titles)
+        slugs = allocate_slugs(Article, titles)
+        articles = [
+            Article(
+                title=data['title'],
+                content=data['content'],
+                slug=slug,
+                author_id=self._author_id(request, data, request.user.id),
+            )
+            for (_, _, data), slug in zip(valid, slugs)
+        ]
+        Article.objects.bulk_create(articles)
+        self._set_relations([(article, data) for article, (_, _, data) in zip(articles, valid)], replace=False)
+        return [(index, article) for article, (index, _, _) in zip(articles, valid)]
+
+    def update_objects(self, request, valid):
+        now = timezone.now()
+        fields = {'updated_at'}
+        for _, article, data in valid:
+            for field in ('title', 'content'):
+                if field in data:
+                    setattr(article, field, data[field])
+                    fields.add(field)
+            author_id = self._author_id(request, data, article.author_id)
+            if author_id != article.author_id:
+                article.author_id = author_id
+                fields.add('author')
+            article.updated_at = now
+        Article.objects.bulk_update([article for _, article, _ in valid], sorted(fields))
+        self._set_relations([(article, data) for _, article, data in valid], replace=True)
+        return [(index, article) for index, article, _ in valid]
+
+
+class TaxonomyBulkView(BulkWriteView):
+    """Shared by categories and tags: unique name and slug, no relations of their own."""
+
+    def validate_batch(self, request, valid, created, errors):
+        names, slugs = {}, {}
+        for index, instance, data in valid:
+            pk = instance.pk if instance is not None else None
+            if 'name' in data:
+                names[index] = (data['name'], pk)
+            if data.get('slug'):
+                slugs[index] = (data['slug'], pk)
+        self.check_unique(errors, 'name', names)
+        self.check_unique(errors, 'slug', slugs)
+
+    def create_objects(self, request, valid):
+        # Items without a slug get one that avoids the table and the slugs given in this batch
+        unnamed = [data for _, _, data in valid if not data.get('slug')]
+        given = [data['slug'] for _, _, data in valid if data.get('slug')]
+        lock_slug_bases(self.model, [data['name'] for data in unnamed])
+        slugs = iter(allocate_slugs(self.model, [data['name'] for data in unnamed], reserved=given))
+        objects = [
+            self.model(**{**data, 'slug': data.get('slug') or next(slugs)})
+            for _, _, data in valid
+        ]
+        self.model.objects.bulk_create(objects)
+        return [(index, obj) for obj, (index, _, _) in zip(objects, valid)]
+
+
+class CategoryBulkView(TaxonomyBulkView):
+    model = Category
+    serializer_class = BulkCategorySerializer
+
+
+class TagBulkView(TaxonomyBulkView):
+    model = Tag
+    serializer_class = BulkTagSerializer
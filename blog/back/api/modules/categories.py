@@ -2,13 +2,16 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from api.models import Category
 from api.serializers import CategorySerializer
+from api.caching import GenerationCachedMixin
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(GenerationCachedMixin, generics.ListCreateAPIView):
+    cache_generation = 'category'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(GenerationCachedMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_generation = 'category'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
\ No newline at end of file
@@ -3,15 +3,34 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from api.models import Comment
+from api.comment_tree import CommentTree, load_reply_tree
 from api.serializers import CommentSerializer
 from api.permissions import IsCommentAuthorOrAdminOrReadOnly
 from rest_framework.generics import RetrieveUpdateDestroyAPIView
+import logging
 
-class CommentListCreateView(generics.ListCreateAPIView):
+logger = logging.getLogger(__name__)
+
+class CommentTreeListMixin:
+    """
+    list() for unpaginated comment lists: every reply is in the listed rows already, so index
+    them into a CommentTree instead of letting the serializer query replies per comment.
+    """
+    def list(self, request, *args, **kwargs):
+        comments = list(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        context['comment_tree'] = CommentTree(comments)
+        serializer = self.get_serializer(comments, many=True, context=context)
+        return Response(serializer.data)
+
+class CommentListCreateView(CommentTreeListMixin, generics.ListCreateAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        return CommentSerializer.annotate_viewer(super().get_queryset().select_related('author'), self.request)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -21,11 +40,17 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsCommentAuthorOrAdminOrReadOnly]
     lookup_field = 'id'
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        return CommentSerializer.annotate_viewer(super().get_queryset().select_related('author'), self.request)
+
+class CommentViewSet(CommentTreeListMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     lookup_field = 'id'
 
+    def get_queryset(self):
+        return CommentSerializer.annotate_viewer(super().get_queryset().select_related('author'), self.request)
+
     @action(detail=True, methods=['post'])
     def add_reply(self, request, id=None):  # Changed pk to id to match lookup_field
         parent_comment = self.get_object()  # This method uses the lookup_field ('id')
@@ -34,10 +59,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         context = self.get_serializer_context()
         serializer = self.get_serializer(data=request.data, context=context)
 
-        print("Parent comment:", parent_comment)  # בדוק את התגובה האב
-        print("Request data:", request.data)  # בדוק את הנתונים שנשלחים
-        # בדוק את ההקשר שנוצר
-        print("Serializer context:", self.get_serializer_context())
+        logger.debug("Reply to comment %s by user %s: %s", parent_comment.pk, request.user.pk, request.data)
 
         serializer = self.get_serializer(
             data=request.data, context=self.get_serializer_context())
@@ -50,11 +72,11 @@ class CommentViewSet(viewsets.ModelViewSet):
                 )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                print("Error during reply creation:", str(e))
+                logger.exception("Error adding a reply to comment %s", parent_comment.pk)
                 return Response({"error": "Failed to add reply", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         else:
             # בדוק את השגיאות שמוחזרות מה-serializer
-            print("Serializer errors:", serializer.errors)
+            logger.debug("Reply to comment %s rejected: %s", parent_comment.pk, serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get_permissions(self):
@@ -67,10 +89,10 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         try:
-            print("Request data:", self.request.data)  # בדוק את הנתונים שנשלחים לשרת
+            logger.debug("New comment by user %s: %s", self.request.user.pk, self.request.data)
             serializer.save(author=self.request.user)
         except Exception as e:
-            print("Error during comment creation:", str(e))
+            logger.exception("Error creating a comment")
             raise
 
     def destroy(self, request, *args, **kwargs):
@@ -82,15 +104,16 @@ class CommentViewSet(viewsets.ModelViewSet):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['get'])
-    def replies(self, request, pk=None):
+    def replies(self, request, id=None):
         comment = self.get_object()
-        replies = Comment.objects.filter(parent=comment)
+        tree = load_reply_tree(comment, request)
 
         # Pass context with depth 0 to start fresh nesting count
         context = self.get_serializer_context()
         context['depth'] = 0
+        context['comment_tree'] = tree
 
-        serializer = self.get_serializer(replies, many=True, context=context)
+        serializer = self.get_serializer(tree.roots, many=True, context=context)
         return Response(serializer.data)
 
 
@@ -0,0 +1,18 @@
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from api.suggest import suggest_index
+
+class SuggestView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        default_limit = getattr(settings, 'SUGGEST_DEFAULT_LIMIT', 10)
+        max_limit = getattr(settings, 'SUGGEST_MAX_LIMIT', 50)
+        try:
+            limit = int(request.query_params.get('limit', default_limit))
+        except ValueError:
+            limit = default_limit
+        limit = max(1, min(limit, max_limit))
+        return Response(suggest_index.search(request.query_params.get('q', ''), limit))
@@ -2,13 +2,16 @@ from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from api.models import Tag 
 from api.serializers import TagSerializer 
+from api.caching import GenerationCachedMixin
 
-class TagListCreateView(generics.ListCreateAPIView):
+class TagListCreateView(GenerationCachedMixin, generics.ListCreateAPIView):
+    cache_generation = 'tag'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
 
-class TagDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TagDetailView(GenerationCachedMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_generation = 'tag'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
\ No newline at end of file
@@ -1,6 +1,10 @@
 from rest_framework import generics
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.contrib.auth.models import User
+from api.revocation import revoke_user_tokens
 from api.serializers import UserSerializer
 
 class UserListView(generics.ListAPIView):
@@ -11,4 +15,19 @@ class UserListView(generics.ListAPIView):
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    permission_classes = [IsAdminUser]
\ No newline at end of file
+    permission_classes = [IsAdminUser]
+
+    def perform_update(self, serializer):
+        was_active = serializer.instance.is_active
+        user = serializer.save()
+        if was_active and not user.is_active:
+            revoke_user_tokens(user)
+
+class UserSignOutView(APIView):
+    """Forced sign-out: every access and refresh token the user holds stops working immediately."""
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, pk):
+        user = get_object_or_404(User, pk=pk)
+        revoke_user_tokens(user)
+        return Response({"message": f"Signed out {user.username} everywhere"})
@@ -0,0 +1,137 @@
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on a composite, unique key such as (created_at, id).
+
+    DRF's CursorPagination keys on the first ordering field and uses an offset to step over
+    ties; here the cursor carries every key value, so each page is a single index range scan
+    of page_size + 1 rows no matter how deep it is. All ordering fields must share a direction
+    and the last one must be unique. Cursors are opaque base64-encoded JSON.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'API_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+
+    def _fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _descending(self):
+        return self.ordering[0].startswith('-')
+
+    def _after(self, values, descending):
+        """Q selecting rows strictly after `values` in the given direction."""
+        fields = self._fields()
+        op = 'lt' if descending else 'gt'
+        inclusive = 'lte' if descending else 'gte'
+        # The leading inclusive bound lets the planner turn the OR below into an index range scan
+        condition = Q(**{f'{fields[0]}__{inclusive}': values[0]})
+        after = Q()
+        for i, field in enumerate(fields):
+            equal = {prev: values[j] for j, prev in enumerate(fields[:i])}
+            after |= Q(**equal, **{f'{field}__{op}': values[i]})
+        return condition & after
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched through the async ORM."""
+        queryset = self._page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self._set_page([obj async for obj in queryset])
+
+    def _page_queryset(self, queryset, request):
+        """The page_size + 1 rows after the cursor, in cursor direction; None when not paginating."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor['r'])
+        descending = self._descending() != reverse
+
+        order = [('-' if descending else '') + field for field in self._fields()]
+        queryset = queryset.order_by(*order)
+        if self.cursor:
+            queryset = queryset.filter(self._after(self.cursor['p'], descending))
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        reverse = bool(self.cursor and self.cursor['r'])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        # Moving forward there is a previous page whenever we came from a cursor;
+        # moving backward there is always a next page (the one we came from).
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else self.cursor is not None
+        return self.page
+
+    def _position(self, obj):
+        field_values = []
+        for field in self._fields():
+            value = getattr(obj, field)
+            field_values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return field_values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor({'p': self._position(self.page[-1]), 'r': False})
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor({'p': self._position(self.page[0]), 'r': True})
+
+    def encode_cursor(self, cursor):
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            fields = self._fields()
+            if len(cursor['p']) != len(fields):
+                raise ValueError
+            values = [self.model._meta.get_field(field).to_python(value) for field, value in zip(fields, cursor['p'])]
+            return {'p': values, 'r': bool(cursor.get('r'))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+
+class ArticlePagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ActivityLogPagination(KeysetPagination):
+    ordering = ('-timestamp', '-id')
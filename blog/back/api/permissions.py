@@ -1,20 +1,19 @@
 from rest_framework import permissions
 from django.db.models import Q
 import logging
+from .claims import request_is_staff
 
 logger = logging.getLogger(__name__)
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
-            logger.debug(f"READ access granted for {request.user} on {obj}")
             return True
 
-        return request.user and request.user.is_authenticated and obj.author == request.user
+        return request.user and request.user.is_authenticated and obj.author_id == request.user.id
 
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
-            logger.debug(f"READ permission granted at view level for {request.user}")
             return True
         return request.user and request.user.is_authenticated
 
@@ -22,7 +21,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return request.user and request.user.is_staff
+        return request_is_staff(request)
 
 class IsBlogUserOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -43,52 +42,46 @@ class IsCommentAuthorOrArticleAuthorOrAdmin(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
 
-        if obj.author.id == request.user.id:
-            print("  - Permission granted: User is comment author")
+        if obj.author_id == request.user.id:
+            logger.debug("Comment %s: permission granted to its author", obj.pk)
             return True
 
         try:
-            if hasattr(obj, 'article') and obj.article and obj.article.author:
-                if obj.article.author.id == request.user.id:
-                    print("  - Permission granted: User is article author")
+            if hasattr(obj, 'article') and obj.article:
+                if obj.article.author_id == request.user.id:
+                    logger.debug("Comment %s: permission granted to the article author", obj.pk)
                     return True
         except Exception as e:
-            print(f"  - Error checking article author: {str(e)}")
+            logger.warning("Comment %s: error checking the article author: %s", obj.pk, e)
 
-        if request.user.is_staff:
-            print("  - Permission granted: User is admin")
+        if request_is_staff(request):
+            logger.debug("Comment %s: permission granted to admin %s", obj.pk, request.user.pk)
             return True
             
-        print("  - Permission denied: No valid permission")
+        logger.debug("Comment %s: permission denied to user %s", obj.pk, request.user.pk)
         return False
 
 class DebugPermission(permissions.BasePermission):
     def has_permission(self, request, view):
-        user_status = "Anonymous" if request.user.is_anonymous else f"User: {request.user.username}"
-        method = request.method
-        path = request.path
-        
-        logger.info(f"DEBUG PERMISSION: {user_status} | Method: {method} | Path: {path}")
+        logger.debug("DEBUG PERMISSION: user %s | Method: %s | Path: %s", request.user, request.method, request.path)
         
         if request.method in permissions.SAFE_METHODS:
-            logger.info(f"READ permission granted - returning True")
+            logger.debug("READ permission granted")
             return True
         
         is_authenticated = request.user and request.user.is_authenticated
-        logger.info(f"WRITE permission check - authenticated: {is_authenticated}")
+        logger.debug("WRITE permission check - authenticated: %s", is_authenticated)
         return is_authenticated
     
     def has_object_permission(self, request, view, obj):
-        user_status = "Anonymous" if request.user.is_anonymous else f"User: {request.user.username}"
-        
-        logger.info(f"DEBUG OBJECT PERMISSION: {user_status} | Object: {obj}")
+        logger.debug("DEBUG OBJECT PERMISSION: user %s | Object: %s", request.user, obj)
         
         if request.method in permissions.SAFE_METHODS:
-            logger.info(f"READ object permission granted - returning True")
+            logger.debug("READ object permission granted")
             return True
         
-        is_author = hasattr(obj, 'author') and obj.author == request.user
-        logger.info(f"WRITE object permission check - is author: {is_author}")
+        is_author = hasattr(obj, 'author_id') and obj.author_id == request.user.id
+        logger.debug("WRITE object permission check - is author: %s", is_author)
         return is_author
 
 class IsCommentAuthorOrAdminOrReadOnly(permissions.BasePermission):
@@ -102,4 +95,4 @@ class IsCommentAuthorOrAdminOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the author of the comment or an admin.
-        return obj.author == request.user or request.user.is_staff
\ No newline at end of file
+        return obj.author_id == request.user.id or request_is_staff(request)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from api.models import RevokedToken
+
+# Rows are re-read this far behind the newest revoked_at already seen, so a revocation whose
+# transaction commits after a later one is still picked up by the incremental sync.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _timestamp(value):
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+class RevocationList:
+    """
+    In-memory copy of RevokedToken: a jti -> expiry map plus user -> cutoff maps (one for whole
+    tokens, one for permission claims only), so the authentication path checks a token with a
+    few dict lookups instead of a query.
+
+    Revocations made in this process apply immediately. Rows written by other workers are picked
+    up by an incremental sync (only rows newer than the last one seen) that runs at most every
+    TOKEN_REVOCATION_SYNC_INTERVAL seconds, from whichever request thread notices it is due.
+    Entries are dropped once the token they revoke would have expired anyway.
+
+    Cutoffs are kept in whole seconds, like a token's iat: a token issued in the second of a
+    forced sign-out (typically the fresh login right after it) is not revoked by it. Claims
+    issued in the second of a role change are still distrusted, which only costs a lookup.
+    """
+    def __init__(self):
+        # Writers (add, purge, clear) hold this; lookups are single dict reads
+        self._lock = threading.Lock()
+        self._jtis = {}
+        self._cutoffs = {}
+        self._claim_cutoffs = {}
+        self._sync_lock = threading.Lock()
+        self._synced_through = None
+        self._checked_at = None
+
+    def is_revoked(self, token):
+        self._maybe_sync()
+        if token.get('jti') in self._jtis:
+            return True
+        return self._issued_before_cutoff(token, self._cutoffs)
+
+    def claims_stale(self, token):
+        """True when the permission snapshot in `token` predates a role change of its user."""
+        self._maybe_sync()
+        return self._issued_before_cutoff(token, self._claim_cutoffs, same_second=True)
+
+    def _issued_before_cutoff(self, token, cutoffs, same_second=False):
+        cutoff = cutoffs.get(token.get(api_settings.USER_ID_CLAIM))
+        if cutoff is None:
+            return False
+        iat = token.get('iat', 0)
+        return iat <= cutoff[0] if same_second else iat < cutoff[0]
+
+    def add(self, jti, user_id, revoked_at, expires_at, claims_only=False):
+        with self._lock:
+            if jti:
+                self._jtis[jti] = _timestamp(expires_at)
+            elif user_id is not None:
+                cutoffs = self._claim_cutoffs if claims_only else self._cutoffs
+                cutoff = int(_timestamp(revoked_at))
+                previous = cutoffs.get(user_id)
+                if previous is None or previous[0] < cutoff:
+                    cutoffs[user_id] = (cutoff, _timestamp(expires_at))
+
+    def _maybe_sync(self):
+        interval = getattr(settings, 'TOKEN_REVOCATION_SYNC_INTERVAL', 5)
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < interval:
+            return
+        # One thread syncs; the others keep answering from the current copy
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = now
+            self.sync()
+        finally:
+            self._sync_lock.release()
+
+    def sync(self):
+        rows = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        if self._synced_through is not None:
+            rows = rows.filter(revoked_at__gte=self._synced_through - SYNC_OVERLAP)
+        for jti, user_id, revoked_at, expires_at, claims_only in rows.values_list(
+                'jti', 'user_id', 'revoked_at', 'expires_at', 'claims_only'):
+            self.add(jti, user_id, revoked_at, expires_at, claims_only)
+            if self._synced_through is None or revoked_at > self._synced_through:
+                self._synced_through = revoked_at
+        self._purge()
+
+    def _purge(self):
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, expires in self._jtis.items() if expires <= now]:
+                del self._jtis[jti]
+            for cutoffs in (self._cutoffs, self._claim_cutoffs):
+                for user_id in [user_id for user_id, (_, expires) in cutoffs.items() if expires <= now]:
+                    del cutoffs[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+            self._cutoffs.clear()
+            self._claim_cutoffs.clear()
+            self._synced_through = None
+            self._checked_at = None
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """Revoke one access or refresh token (a simplejwt Token) until it expires."""
+    jti = token.get('jti')
+    if not jti:
+        return
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    revoked, _ = RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={'user_id': token.get(api_settings.USER_ID_CLAIM), 'expires_at': expires_at},
+    )
+    revocation_list.add(revoked.jti, revoked.user_id, revoked.revoked_at, revoked.expires_at)
+    _delete_expired()
+
+
+def _longest_token_lifetime():
+    return max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+
+
+def revoke_user_tokens(user):
+    """Forced sign-out: every token issued to `user` so far stops working."""
+    revoked = RevokedToken.objects.create(user=user, expires_at=timezone.now() + _longest_token_lifetime())
+    revocation_list.add(None, revoked.user_id, revoked.revoked_at, revoked.expires_at)
+    _delete_expired()
+
+
+def revoke_user_claims(user_ids):
+    """Tokens issued so far keep working, but their permission snapshot is no longer trusted."""
+    expires_at = timezone.now() + _longest_token_lifetime()
+    rows = RevokedToken.objects.bulk_create([
+        RevokedToken(user_id=user_id, claims_only=True, expires_at=expires_at) for user_id in set(user_ids)
+    ])
+    for revoked in rows:
+        revocation_list.add(None, revoked.user_id, revoked.revoked_at, revoked.expires_at, claims_only=True)
+
+
+def _delete_expired():
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
@@ -0,0 +1,62 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from api.models import Article
+
+SEARCH_CONFIG = 'english'
+TRIGRAM_MIN_SIMILARITY = 0.3
+
+
+def _relation_names(relation, name_field):
+    """Space-separated names of the article's categories or tags, as a correlated subquery."""
+    through = getattr(Article, relation).through
+    names = (
+        through.objects.filter(article_id=OuterRef('pk'))
+        .values('article_id')
+        .annotate(names=StringAgg(name_field, ' '))
+        .values('names')
+    )
+    return Coalesce(Subquery(names, output_field=TextField()), Value(''), output_field=TextField())
+
+
+def refresh_search_vectors(article_ids):
+    """
+    Rebuild Article.search_vector for the given articles with a single UPDATE: title and content
+    come from the row itself, category and tag names from correlated subqueries.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    vector = (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(_relation_names('categories', 'category__name'), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(_relation_names('tags', 'tag__name'), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+    # update() rather than save() so the post_save receivers do not fire again
+    Article.objects.filter(pk__in=article_ids).update(search_vector=vector)
+
+
+def search_articles(queryset, text):
+    """
+    Ranked full-text search over the GIN-indexed search_vector.
+    Falls back to trigram similarity on the title when nothing matches, which catches typos.
+    """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    matches = (
+        queryset
+        .filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', '-created_at')
+    )
+    if matches.exists():
+        return matches
+    return (
+        queryset
+        .filter(title__trigram_similar=text)
+        .annotate(similarity=TrigramSimilarity('title', text))
+        .filter(similarity__gte=TRIGRAM_MIN_SIMILARITY)
+        .order_by('-similarity', '-created_at')
+    )
@@ -1,9 +1,17 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BooleanField, ExpressionWrapper, Prefetch, Q, Value
+from django.db.models.functions import Substr
 from rest_framework import serializers
-from .models import Category, Tag, Article, Comment, UserProfile, ActivityLog
+from rest_framework.relations import MANY_RELATION_KWARGS
+from .models import Category, Tag, Article, Comment, UserProfile, ActivityLog, COMMENT_MAX_DEPTH
 from django.contrib.auth.models import User, Group
 from rest_framework.fields import CurrentUserDefault
-from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from rest_framework_simplejwt.exceptions import TokenError
+from .claims import SnapshotRefreshToken, request_is_staff
+from .signals import bulk_saved
+from .slugs import allocate_slugs
 
 class GroupSerializer(serializers.ModelSerializer):
     class Meta:
@@ -38,7 +46,12 @@ class RegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
+class SnapshotTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = SnapshotRefreshToken
+
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = SnapshotRefreshToken
+
     def validate(self, attrs):
         try:
             return super().validate(attrs)
@@ -89,58 +102,295 @@ class CommentSerializer(serializers.ModelSerializer):
 
     # Removed custom __init__ - rely on default ModelSerializer behavior + view providing data
 
+    @classmethod
+    def annotate_viewer(cls, queryset, request):
+        """
+        Adds viewer_is_author / viewer_can_delete for request.user, computed in the query, so
+        rendering a thread never has to look at each comment's author.
+        """
+        user = getattr(request, 'user', None)
+        if not user or not user.is_authenticated:
+            return queryset.annotate(viewer_is_author=Value(False), viewer_can_delete=Value(False))
+        is_author = ExpressionWrapper(Q(author_id=user.pk), output_field=BooleanField())
+        can_delete = Value(True) if request_is_staff(request) else is_author
+        return queryset.annotate(viewer_is_author=is_author, viewer_can_delete=can_delete)
+
     def get_is_author(self, obj):
+        if hasattr(obj, 'viewer_is_author'):
+            return obj.viewer_is_author
         # Ensure request exists in context, handle potential None user
         request = self.context.get('request')
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return False
-        return user.is_authenticated and obj.author.id == user.id
+        return obj.author_id == user.id
 
     def get_is_admin(self, obj):
         request = self.context.get('request')
-        user = getattr(request, 'user', None)
-        return user and user.is_staff
+        return request_is_staff(request) if request is not None else False
 
     def get_can_delete(self, obj):
+        if hasattr(obj, 'viewer_can_delete'):
+            return obj.viewer_can_delete
         request = self.context.get('request')
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return False
-        return obj.author.id == user.id or user.is_staff
+        return obj.author_id == user.id or request_is_staff(request)
 
     def get_replies(self, obj):
         depth = self.context.get('depth', 0)
         if depth > 2:
             return []
-        serializer = CommentSerializer(Comment.objects.filter(parent=obj), many=True, context={**self.context, 'depth': depth + 1})
+        # A preloaded CommentTree (see api.comment_tree) avoids one query per comment
+        tree = self.context.get('comment_tree')
+        if tree is not None:
+            replies = tree.replies(obj)
+        else:
+            replies = self.annotate_viewer(Comment.objects.filter(parent=obj).select_related('author'), self.context.get('request'))
+        serializer = CommentSerializer(replies, many=True, context={**self.context, 'depth': depth + 1})
         return serializer.data
 
     def get_reply_count(self, obj):
-        return Comment.objects.filter(parent=obj).count()
+        return obj.reply_count
 
     def validate(self, data):
         parent = data.get('parent')
         article = data.get('article')
-        if parent and article and parent.article != article:
+        if self.instance is not None:
+            # Moving a comment to another article would leave both articles' counts wrong
+            if article is not None and article.pk != self.instance.article_id:
+                raise serializers.ValidationError("A comment cannot be moved to another article")
+            article = self.instance.article
+            if parent and (parent.pk == self.instance.pk or parent.path.startswith(self.instance.path)):
+                raise serializers.ValidationError("A comment cannot be moved under one of its own replies")
+        if parent and article and parent.article_id != article.pk:
             raise serializers.ValidationError("Parent comment must belong to the same article")
+        if parent and parent.depth >= COMMENT_MAX_DEPTH:
+            raise serializers.ValidationError(f"Replies can be nested at most {COMMENT_MAX_DEPTH} levels deep")
         if parent and not article:
             data['article'] = parent.article
         return data
 
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    """many=True list whose items are resolved by the child field all at once."""
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve_many(list(data))
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that, with many=True, looks up every id in one IN query instead of
+    one query per id.
+    """
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def to_pk(self, value):
+        if isinstance(value, bool):
+            self.fail('incorrect_type', data_type=type(value).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(value)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(value).__name__)
+
+    def resolve_many(self, data):
+        pks = list(dict.fromkeys(self.to_pk(value) for value in data))
+        found = self.get_queryset().in_bulk(pks)
+        for pk in pks:
+            if pk not in found:
+                self.fail('does_not_exist', pk_value=pk)
+        return [found[pk] for pk in pks]
+
+class TagRelatedField(BatchedPrimaryKeyRelatedField):
+    """
+    Tags by id or by name: integers (and strings of digits) are ids, any other string is a tag
+    name. Ids and names are looked up together in one query; names that match no tag come back
+    as unsaved Tag instances, which ArticleSerializer creates when the article is saved.
+    """
+    default_error_messages = {
+        'invalid_name': 'Tag names must be 1 to {max_length} characters long.',
+    }
+
+    def resolve_many(self, data):
+        pks, names = [], []
+        for value in data:
+            if isinstance(value, str) and not value.strip().isdigit():
+                names.append(' '.join(value.split()))
+            else:
+                pks.append(self.to_pk(value))
+        pks, names = list(dict.fromkeys(pks)), list(dict.fromkeys(names))
+        max_length = Tag._meta.get_field('name').max_length
+        if any(not name or len(name) > max_length for name in names):
+            self.fail('invalid_name', max_length=max_length)
+
+        found = self.get_queryset().filter(Q(pk__in=pks) | Q(name__in=names)) if pks or names else []
+        by_pk = {tag.pk: tag for tag in found}
+        by_name = {tag.name: tag for tag in found}
+        for pk in pks:
+            if pk not in by_pk:
+                self.fail('does_not_exist', pk_value=pk)
+        tags = [by_pk[pk] for pk in pks] + [by_name.get(name) or Tag(name=name) for name in names]
+        return list({id(tag): tag for tag in tags}.values())
+
 class ArticleSerializer(serializers.ModelSerializer):
+    """
+    GET requests can project the output: ?fields=title,author_name,excerpt keeps only those fields,
+    ?omit=content drops fields. `excerpt` (the first ?excerpt_length= characters of content, cut in
+    the database) is only returned when asked for. Views pass their queryset through
+    project_queryset() so that columns and relations nobody asked for are never fetched.
+    """
     category_details = CategorySerializer(source='categories', many=True, read_only=True)
     tag_details = TagSerializer(source='tags', many=True, read_only=True)
     author_name = serializers.CharField(source='author.username', read_only=True)
+    excerpt = serializers.SerializerMethodField()
+
+    OPTIONAL_FIELDS = {'excerpt'}
+    # Article columns each serializer field reads; id and created_at are always loaded (pagination keys)
+    FIELD_COLUMNS = {
+        'title': ['title'],
+        'slug': ['slug'],
+        'content': ['content'],
+        'author': ['author'],
+        'author_name': ['author', 'author__username'],
+        'comment_count': ['comment_count'],
+        'updated_at': ['updated_at'],
+    }
 
     class Meta:
         model = Article
         fields = [
-            'id', 'title', 'content', 'author', 'author_name',
+            'id', 'title', 'slug', 'content', 'author', 'author_name',
             'categories', 'tags', 'category_details', 'tag_details',
-            'created_at', 'updated_at'
+            'comment_count', 'created_at', 'updated_at', 'excerpt'
         ]
-        read_only_fields = ['author', 'author_name', 'created_at', 'updated_at']
+        read_only_fields = ['slug', 'author', 'author_name', 'comment_count', 'created_at', 'updated_at']
+
+    def build_relational_field(self, field_name, relation_info):
+        field_class, field_kwargs = super().build_relational_field(field_name, relation_info)
+        if field_name == 'tags':
+            return TagRelatedField, field_kwargs
+        return BatchedPrimaryKeyRelatedField, field_kwargs
+
+    def create(self, validated_data):
+        self.save_new_tags(validated_data)
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        self.save_new_tags(validated_data)
+        return super().update(instance, validated_data)
+
+    def save_new_tags(self, validated_data):
+        """
+        Creates the tags that were given by a name no tag has yet, in one INSERT. A tag another
+        request created in the meantime is picked up instead of failing on the unique name.
+        """
+        tags = validated_data.get('tags')
+        new = [tag for tag in tags or [] if tag.pk is None]
+        if not new:
+            return
+        for tag, slug in zip(new, allocate_slugs(Tag, [tag.name for tag in new])):
+            tag.slug = slug
+        Tag.objects.bulk_create(new, ignore_conflicts=True)
+        created = {tag.name: tag for tag in Tag.objects.filter(name__in=[tag.name for tag in new])}
+        missing = [tag.name for tag in new if tag.name not in created]
+        if missing:
+            raise serializers.ValidationError({'tags': [f'Tag "{missing[0]}" could not be created.']})
+        validated_data['tags'] = [created[tag.name] if tag.pk is None else tag for tag in tags]
+        request = self.context.get('request')
+        bulk_saved.send(sender=Tag, instances=list(created.values()), created=True, user=getattr(request, 'user', None))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get('request'))
+        for name in set(self.fields) - selected:
+            self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        available = set(cls.Meta.fields)
+        selected = available - cls.OPTIONAL_FIELDS
+        if request is None or request.method != 'GET':
+            return selected
+        fields = {f.strip() for f in request.query_params.get('fields', '').split(',') if f.strip()}
+        if fields & available:
+            selected = fields & available
+        omit = {f.strip() for f in request.query_params.get('omit', '').split(',') if f.strip()}
+        return selected - omit
+
+    @classmethod
+    def excerpt_length(cls, request):
+        default = getattr(settings, 'ARTICLE_EXCERPT_LENGTH', 200)
+        try:
+            length = int(request.query_params.get('excerpt_length', default))
+        except (AttributeError, ValueError):
+            return default
+        return max(1, min(length, getattr(settings, 'ARTICLE_EXCERPT_MAX_LENGTH', 1000)))
+
+    @classmethod
+    def project_queryset(cls, queryset, request):
+        if request is None or request.method != 'GET':
+            return queryset.defer('search_vector')
+        selected = cls.selected_fields(request)
+        columns = {'id', 'created_at'}
+        for name in selected:
+            columns.update(cls.FIELD_COLUMNS.get(name, []))
+        queryset = queryset.select_related(None).prefetch_related(None).only(*columns)
+        if 'author_name' in selected:
+            queryset = queryset.select_related('author')
+        for relation, model, detail in (('categories', Category, 'category_details'), ('tags', Tag, 'tag_details')):
+            if detail in selected:
+                queryset = queryset.prefetch_related(relation)
+            elif relation in selected:
+                queryset = queryset.prefetch_related(Prefetch(relation, queryset=model.objects.only('id')))
+        if 'excerpt' in selected:
+            # One character more than needed tells get_excerpt whether the text was cut
+            queryset = queryset.annotate(excerpt_text=Substr('content', 1, cls.excerpt_length(request) + 1))
+        return queryset
+
+    def get_excerpt(self, obj):
+        length = self.excerpt_length(self.context.get('request'))
+        text = getattr(obj, 'excerpt_text', None)
+        if text is None:
+            text = obj.content[:length + 1]
+        if len(text) > length:
+            return text[:length].rstrip() + '\u2026'
+        return text
+
+class BulkArticleSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk article write. Relations and the author are plain ids here: the bulk
+    view checks all of them with one query per relation instead of one per id.
+    """
+    author = serializers.IntegerField(required=False)
+    categories = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    tags = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'content', 'author', 'categories', 'tags']
+
+class BulkCategorySerializer(serializers.ModelSerializer):
+    """One item of a bulk category write; name/slug uniqueness is checked for the whole batch."""
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'description', 'slug']
+        extra_kwargs = {'name': {'validators': []}, 'slug': {'validators': []}}
+
+class BulkTagSerializer(serializers.ModelSerializer):
+    """One item of a bulk tag write; name/slug uniqueness is checked for the whole batch."""
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'slug']
+        extra_kwargs = {'name': {'validators': []}, 'slug': {'validators': []}}
 
 class ActivityLogSerializer(serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
@@ -0,0 +1,11 @@
+from django.dispatch import Signal
+
+# bulk_create() / bulk_update() send no post_save, so the bulk endpoints send these instead and
+# every subsystem that keeps derived state (search vectors, caches, suggestions, counters,
+# activity log) applies the whole batch at once.
+#
+# bulk_saved: sender=model, instances=[...], created=bool, user=acting user
+# bulk_deleted: sender=model, ids=[...], user=acting user (rows are already gone; the per-row
+# delete signals have fired as usual)
+bulk_saved = Signal()
+bulk_deleted = Signal()
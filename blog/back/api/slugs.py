@@ -0,0 +1,199 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.text import slugify
+from api.models import Article
+from api.signals import bulk_deleted, bulk_saved
+
+# Room kept at the end of a slug for a "-N" suffix
+SUFFIX_WIDTH = 10
+# Saves retried when concurrent writers keep taking the allocated slug first
+SLUG_SAVE_ATTEMPTS = 5
+
+
+def _base_slug(model, value, field):
+    max_length = model._meta.get_field(field).max_length
+    base = slugify(value or '')[:max_length - SUFFIX_WIDTH].strip('-')
+    if not base:
+        return model._meta.model_name
+    if base.isdigit():
+        # A bare number would be routed as an id
+        return f'{model._meta.model_name}-{base}'
+    return base
+
+
+def _suffix(slug, base):
+    tail = slug[len(base) + 1:]
+    if slug.startswith(f'{base}-') and tail.isdigit():
+        return int(tail)
+    return None
+
+
+def allocate_slugs(model, values, field='slug', exclude_pk=None, reserved=()):
+    """
+    One unique slug per value (a title or name), in order: slugify(value), or when that is
+    taken the next free "-N" form above the highest suffix in use. Slugs already in the table,
+    earlier values of the same call, `reserved` and the model's RESERVED_SLUGS all count as
+    taken. Every base and its suffixed forms are read in one query, which PostgreSQL answers
+    from the prefix (varchar_pattern_ops) index Django creates next to the unique one.
+    """
+    bases = [_base_slug(model, value, field) for value in values]
+    if not bases:
+        return []
+    distinct = sorted(set(bases))
+    pattern = '^({})(-[0-9]{{1,9}})?$'.format('|'.join(re.escape(base) for base in distinct))
+    rows = model._base_manager.filter(
+        reduce(or_, (Q(**{f'{field}__startswith': base}) for base in distinct)),
+        **{f'{field}__regex': pattern},
+    )
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    taken = set(rows.values_list(field, flat=True))
+    taken.update(reserved)
+    taken.update(getattr(model, 'RESERVED_SLUGS', ()))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            suffix = max((n for n in (_suffix(s, base) for s in taken) if n is not None), default=1) + 1
+            slug = f'{base}-{suffix}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(model, value, field='slug', exclude_pk=None):
+    return allocate_slugs(model, [value], field, exclude_pk)[0]
+
+
+def lock_slug_bases(model, values, field='slug'):
+    """
+    Transaction-scoped advisory locks on the base slug of each value: writers of the same base
+    allocate one after the other. Taken in one statement, in lock key order, so two writers
+    locking overlapping sets cannot deadlock.
+    """
+    keys = list({f'{model._meta.db_table}.{field}:{_base_slug(model, value, field)}' for value in values})
+    if not keys:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(key) FROM '
+            '(SELECT DISTINCT hashtext(name) AS key FROM unnest(%s::text[]) AS name ORDER BY key) AS keys',
+            [keys],
+        )
+
+
+def save_with_slug(instance, value, save, field='slug'):
+    """
+    Allocate instance.slug from `value` and call `save` (the model's own save) in a savepoint.
+    Saves of the same base slug take turns on an advisory lock, so they see each other's rows;
+    a writer that does not take it can still win the unique constraint, in which case the
+    allocation is redone and the save retried.
+    """
+    model = type(instance)
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                lock_slug_bases(model, [value], field)
+                setattr(instance, field, allocate_slug(model, value, field, exclude_pk=instance.pk))
+                return save()
+        except IntegrityError:
+            slug = getattr(instance, field)
+            taken = model._base_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if not taken or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                setattr(instance, field, '')
+                raise
+
+
+class SlugMap:
+    """
+    Bounded, thread-safe LRU of slug -> id for one model, with a TTL, so that slug routes
+    resolve without a query. Saves and deletes in this process update it; callers that find
+    the id gone (a row deleted by another worker) look the slug up again with refresh=True.
+    """
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._slugs = {}
+
+    def resolve(self, slug, refresh=False):
+        ttl = getattr(settings, 'SLUG_CACHE_TTL', 300)
+        if not refresh:
+            with self._lock:
+                entry = self._entries.get(slug)
+                if entry is not None and time.monotonic() - entry[1] <= ttl:
+                    self._entries.move_to_end(slug)
+                    return entry[0]
+        pk = self.model._base_manager.filter(slug=slug).values_list('pk', flat=True).first()
+        if pk is None:
+            self.discard_slug(slug)
+        else:
+            self.set(slug, pk)
+        return pk
+
+    def set(self, slug, pk):
+        max_size = getattr(settings, 'SLUG_CACHE_SIZE', 4096)
+        with self._lock:
+            previous = self._slugs.get(pk)
+            if previous is not None and previous != slug:
+                self._entries.pop(previous, None)
+            self._entries[slug] = (pk, time.monotonic())
+            self._entries.move_to_end(slug)
+            self._slugs[pk] = slug
+            while len(self._entries) > max_size:
+                _, (old_pk, _) = self._entries.popitem(last=False)
+                self._slugs.pop(old_pk, None)
+
+    def discard_slug(self, slug):
+        with self._lock:
+            entry = self._entries.pop(slug, None)
+            if entry is not None:
+                self._slugs.pop(entry[0], None)
+
+    def discard(self, pks):
+        with self._lock:
+            for pk in pks:
+                slug = self._slugs.pop(pk, None)
+                if slug is not None:
+                    self._entries.pop(slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._slugs.clear()
+
+
+article_slugs = SlugMap(Article)
+
+
+@receiver(post_save, sender=Article)
+def remember_article_slug(sender, instance, **kwargs):
+    if 'slug' in instance.get_deferred_fields():
+        article_slugs.discard([instance.pk])
+    else:
+        article_slugs.set(instance.slug, instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+def forget_article_slug(sender, instance, **kwargs):
+    article_slugs.discard([instance.pk])
+
+
+@receiver(bulk_saved, sender=Article)
+def forget_bulk_article_slugs(sender, instances, **kwargs):
+    article_slugs.discard([instance.pk for instance in instances])
+
+
+@receiver(bulk_deleted, sender=Article)
+def forget_bulk_deleted_article_slugs(sender, ids, **kwargs):
+    article_slugs.discard(ids)
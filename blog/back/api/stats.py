@@ -0,0 +1,110 @@
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from api.models import Article, Comment, DailyCounter, SiteCounter, User
+from api.signals import bulk_saved
+
+# counter name -> (model, creation timestamp field); totals and daily series share the names
+TRACKED = {
+    'users': (User, 'date_joined'),
+    'articles': (Article, 'created_at'),
+    'comments': (Comment, 'created_at'),
+}
+
+
+def _bump(model, lookup, delta):
+    # A random shard row: concurrent writers seldom pick the same one, so they do not queue
+    # on a single row lock for the rest of their transactions
+    lookup = {**lookup, 'shard': random.randrange(max(1, getattr(settings, 'STATS_COUNTER_SHARDS', 16)))}
+    if model.objects.filter(**lookup).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(value=delta, **lookup)
+    except IntegrityError:
+        # Someone else created the row between our UPDATE and INSERT
+        model.objects.filter(**lookup).update(value=F('value') + delta)
+
+
+def record_created(name, count=1):
+    _bump(SiteCounter, {'name': name}, count)
+    _bump(DailyCounter, {'name': name, 'day': timezone.localdate()}, count)
+
+
+def record_deleted(name, count=1):
+    _bump(SiteCounter, {'name': name}, -count)
+
+
+def site_totals():
+    rows = SiteCounter.objects.filter(name__in=TRACKED).values('name').annotate(total=Sum('value'))
+    values = dict(rows.values_list('name', 'total'))
+    return {name: values.get(name, 0) for name in TRACKED}
+
+
+def daily_series(days):
+    since = timezone.localdate() - timedelta(days=days - 1)
+    series = {name: {} for name in TRACKED}
+    rows = DailyCounter.objects.filter(day__gte=since, name__in=TRACKED).values('day', 'name').annotate(total=Sum('value')).order_by()
+    for day, name, value in rows.values_list('day', 'name', 'total'):
+        series[name][day] = value
+    return {
+        name: [{'day': since + timedelta(days=i), 'count': by_day.get(since + timedelta(days=i), 0)} for i in range(days)]
+        for name, by_day in series.items()
+    }
+
+
+def reconcile(days=None):
+    """
+    Recompute totals with COUNT(*) and rebuild the daily series from creation timestamps
+    (the last `days` days only, or all of them when None). The results are written to shard 0,
+    replacing every shard row of the counters rebuilt.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1) if days else None
+    with transaction.atomic():
+        for name, (model, created_field) in TRACKED.items():
+            SiteCounter.objects.filter(name=name).delete()
+            SiteCounter.objects.create(name=name, value=model.objects.count())
+
+            daily = DailyCounter.objects.filter(name=name)
+            rows = model.objects.annotate(day=TruncDate(created_field))
+            if since:
+                daily = daily.filter(day__gte=since)
+                rows = rows.filter(day__gte=since)
+            daily.delete()
+            DailyCounter.objects.bulk_create(
+                DailyCounter(name=name, day=row['day'], value=row['n'])
+                for row in rows.values('day').annotate(n=Count('pk')).order_by()
+            )
+
+
+def _tracked_name(sender):
+    for name, (model, _) in TRACKED.items():
+        if sender is model:
+            return name
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Comment)
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        record_created(_tracked_name(sender))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Comment)
+def count_deleted(sender, instance, **kwargs):
+    record_deleted(_tracked_name(sender))
+
+
+@receiver(bulk_saved, sender=Article)
+def count_bulk_created(sender, instances, created, **kwargs):
+    if created and instances:
+        record_created(_tracked_name(sender), len(instances))
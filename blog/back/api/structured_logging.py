@@ -0,0 +1,204 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+
+# LogRecord attributes that are not user-supplied `extra` fields
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+def parse_logger_rates(value):
+    """'api=0.1,django.db=0.01' -> {'api': 0.1, 'django.db': 0.01}, as read from the environment."""
+    rates = {}
+    for item in (value or '').split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def _most_specific(rates, logger_name):
+    """The entry for the logger or its nearest configured ancestor ('' matches every logger)."""
+    name = logger_name
+    while True:
+        if name in rates:
+            return name, rates[name]
+        if not name:
+            return None, None
+        name = name.rpartition('.')[0]
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, location, exception and `extra` fields."""
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.thread,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger sampling and rate limiting, applied before a record is queued.
+
+    `sample_rates` maps a logger name to the fraction of its DEBUG/INFO records kept (0.1 keeps
+    one in ten); `rate_limits` maps a logger name to the records per second it may emit, with
+    bursts up to one second's worth. Names apply to child loggers too, the most specific entry
+    winning. Records at `exempt_level` and above always pass. A record that passes after others
+    were dropped carries `suppressed` (how many), so gaps are visible in the output.
+    """
+    def __init__(self, sample_rates=None, rate_limits=None, exempt_level='WARNING'):
+        super().__init__()
+        self.sample_rates = parse_logger_rates(sample_rates) if isinstance(sample_rates, str) else dict(sample_rates or {})
+        self.rate_limits = parse_logger_rates(rate_limits) if isinstance(rate_limits, str) else dict(rate_limits or {})
+        self.exempt_level = logging.getLevelName(exempt_level) if isinstance(exempt_level, str) else exempt_level
+        self._lock = threading.Lock()
+        # name -> (tokens, last refill (monotonic))
+        self._buckets = {}
+        self._suppressed = {}
+
+    def filter(self, record):
+        # Handlers sharing this filter see the same record: decide (and count) it once
+        decision = getattr(record, '_sampling_decision', None)
+        if decision is None:
+            decision = record._sampling_decision = self.decide(record)
+        return decision
+
+    def decide(self, record):
+        if record.levelno >= self.exempt_level:
+            return True
+        key, rate = _most_specific(self.sample_rates, record.name)
+        if rate is not None and random.random() >= rate:
+            return False
+        key, limit = _most_specific(self.rate_limits, record.name)
+        if limit is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            tokens, refilled_at = self._buckets.get(key, (limit, now))
+            tokens = min(limit, tokens + (now - refilled_at) * limit)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full at shutdown: wait for room rather than fail
+        self.queue.put(self._sentinel)
+
+
+class BackgroundHandler(logging.Handler):
+    """
+    Logging handler that only puts records on a bounded in-memory queue; a QueueListener thread
+    formats them and does the I/O, to `filename` when given, otherwise to stderr. A request
+    thread never waits on the disk or a slow console. When the queue is full, records are
+    dropped rather than blocking, and the next one that fits reports how many were lost.
+
+    The listener starts on first use in each process, so forked workers get their own thread.
+    A plain Handler rather than a QueueHandler: dictConfig on Python 3.12+ expects QueueHandler
+    subclasses to be configured with separate target handlers and a listener.
+    """
+    _traceback_formatter = logging.Formatter()
+
+    def __init__(self, filename=None, queue_size=10000, encoding='utf-8'):
+        super().__init__()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        if filename:
+            self.target = logging.FileHandler(filename, encoding=encoding, delay=True)
+        else:
+            self.target = logging.StreamHandler(sys.stderr)
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve what depends on the caller's objects now (arguments may change or hold
+        # frames alive); formatting itself happens later, on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        if self._dropped:
+            record.dropped = self._dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+        else:
+            self._dropped = 0
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's listener thread does not exist here, and its queue's
+                # locks may have been copied mid-use
+                self.queue = queue.Queue(maxsize=self.queue_size)
+            self._listener = _Listener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Write out what is queued and stop the listener thread."""
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+        self._pid = None
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,177 @@
+import bisect
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from api.models import Article, Category, Tag
+from api.signals import bulk_saved
+
+# model -> (result type, field holding the suggestion text)
+SUGGEST_SOURCES = {
+    Article: ('article', 'title'),
+    Tag: ('tag', 'name'),
+    Category: ('category', 'name'),
+}
+
+
+def _normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def _word_keys(text):
+    """Every word-start suffix, so "vege" matches "Growing vegetables" as well as "Vegetables"."""
+    words = _normalize(text).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class PrefixIndex:
+    """
+    Sorted list of (key, type, id) tuples searched with bisect.
+    Lookups never touch the database; writes come from model signals once their transaction
+    commits, and a periodic rebuild keeps workers that did not see a given signal from drifting
+    for long. One thread at a time rebuilds an expired index while the others keep searching the
+    previous one; changes that arrive while it reads the tables are replayed onto the new index.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._keys = []
+        self._labels = {}
+        self._built_at = None
+        # (kind, pk, label or None for a removal) seen during a rebuild, else None
+        self._pending = None
+
+    def _insert(self, kind, pk, label):
+        self._labels[(kind, pk)] = label
+        for key in _word_keys(label):
+            bisect.insort(self._keys, (key, kind, pk))
+
+    def _remove(self, kind, pk):
+        label = self._labels.pop((kind, pk), None)
+        if label is None:
+            return
+        for key in _word_keys(label):
+            i = bisect.bisect_left(self._keys, (key, kind, pk))
+            if i < len(self._keys) and self._keys[i] == (key, kind, pk):
+                del self._keys[i]
+
+    def rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            fresh = PrefixIndex()
+            for model, (kind, field) in SUGGEST_SOURCES.items():
+                for pk, label in model.objects.values_list('pk', field):
+                    fresh._labels[(kind, pk)] = label
+                    fresh._keys.extend((key, kind, pk) for key in _word_keys(label))
+            fresh._keys.sort()
+            with self._lock:
+                self._keys, self._labels = fresh._keys, fresh._labels
+                # The scan may or may not have seen these; applying them again is harmless
+                for kind, pk, label in self._pending:
+                    self._remove(kind, pk)
+                    if label is not None:
+                        self._insert(kind, pk, label)
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _expired(self):
+        max_age = getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 300)
+        return time.monotonic() - self._built_at > max_age
+
+    def ensure_built(self):
+        if self._built_at is None:
+            # Nothing to serve yet: wait for whichever thread is building it
+            with self._rebuild_lock:
+                if self._built_at is None:
+                    self.rebuild()
+            return
+        if self._expired() and self._rebuild_lock.acquire(blocking=False):
+            try:
+                if self._expired():
+                    self.rebuild()
+            finally:
+                self._rebuild_lock.release()
+
+    def update(self, kind, pk, label):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, pk, label))
+            if self._built_at is None:
+                return
+            self._remove(kind, pk)
+            self._insert(kind, pk, label)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, pk, None))
+            if self._built_at is not None:
+                self._remove(kind, pk)
+
+    def update_on_commit(self, changes):
+        """
+        Apply (kind, pk, label or None) changes once the writer's transaction commits (at once
+        outside one), so a rolled-back save never shows up as a suggestion.
+        """
+        changes = list(changes)
+
+        def apply():
+            for kind, pk, label in changes:
+                if label is None:
+                    self.remove(kind, pk)
+                else:
+                    self.update(kind, pk, label)
+
+        if changes:
+            transaction.on_commit(apply, robust=True)
+
+    def search(self, prefix, limit):
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_built()
+        results = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                key, kind, pk = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if (kind, pk) not in seen:
+                    seen.add((kind, pk))
+                    results.append({'type': kind, 'id': pk, 'label': self._labels[(kind, pk)]})
+                i += 1
+        return results
+
+
+suggest_index = PrefixIndex()
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def update_suggest_index(sender, instance, **kwargs):
+    kind, field = SUGGEST_SOURCES[sender]
+    suggest_index.update_on_commit([(kind, instance.pk, getattr(instance, field))])
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    kind, _ = SUGGEST_SOURCES[sender]
+    suggest_index.update_on_commit([(kind, instance.pk, None)])
+
+
+@receiver(bulk_saved, sender=Article)
+@receiver(bulk_saved, sender=Tag)
+@receiver(bulk_saved, sender=Category)
+def update_suggest_index_bulk(sender, instances, **kwargs):
+    kind, field = SUGGEST_SOURCES[sender]
+    suggest_index.update_on_commit((kind, instance.pk, getattr(instance, field)) for instance in instances)
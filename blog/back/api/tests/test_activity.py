@@ -0,0 +1,15 @@
+from datetime import date
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.test import TestCase
+from api.models import ActivityLogDaily
+
+
+class ActivityLogDailyTests(TestCase):
+    def test_rows_without_a_user_are_unique_per_day_and_action(self):
+        ActivityLogDaily.objects.create(day=date(2020, 1, 1), action_type='USER_DELETED', count=2)
+        duplicate = ActivityLogDaily(day=date(2020, 1, 1), action_type='USER_DELETED', count=1)
+        with self.assertRaises(ValidationError):
+            duplicate.validate_constraints()
+        with self.assertRaises(IntegrityError):
+            duplicate.save()
@@ -0,0 +1,62 @@
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from api.claims import SnapshotRefreshToken
+from api.models import Article, Category, Comment, Tag
+from api.modules.articles import ArticleCommentView, ArticleDetailView, ArticleListCreateView, ArticleSlugDetailView
+from api.modules.async_reads import (
+    AsyncArticleCommentView, AsyncArticleDetailView, AsyncArticleListView, AsyncCategoryView, AsyncTagView,
+)
+from api.modules.categories import CategoryDetailView, CategoryListCreateView
+from api.modules.tags import TagListCreateView
+
+
+@override_settings(RESPONSE_CACHE=False)
+class AsyncReadParityTests(TestCase):
+    """Each async read view answers exactly like the DRF view serving the same route."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='x')
+        cls.category = Category.objects.create(name='Parity')
+        tag = Tag.objects.create(name='same')
+        cls.article = Article.objects.create(title='Twins', content='...', author=cls.user)
+        cls.article.categories.add(cls.category)
+        cls.article.tags.add(tag)
+        root = Comment.objects.create(article=cls.article, author=cls.user, content='first')
+        Comment.objects.create(article=cls.article, author=cls.user, parent=root, content='reply')
+
+    async def assert_same(self, sync_view, async_view, path='/', headers=None, **kwargs):
+        def request():
+            return RequestFactory().get(path, headers=headers or {})
+
+        expected = await sync_to_async(lambda: sync_view.as_view()(request(), **kwargs).render())()
+        actual = await async_view.as_view()(request(), **kwargs)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(json.loads(actual.content), json.loads(expected.content))
+        self.assertEqual(actual.get('WWW-Authenticate'), expected.get('WWW-Authenticate'))
+        return actual
+
+    async def test_article_reads(self):
+        await self.assert_same(ArticleListCreateView, AsyncArticleListView, '/api/articles/?page_size=1&fields=id,title')
+        await self.assert_same(ArticleDetailView, AsyncArticleDetailView, pk=self.article.pk)
+        await self.assert_same(ArticleSlugDetailView, AsyncArticleDetailView, slug=self.article.slug)
+        await self.assert_same(ArticleCommentView, AsyncArticleCommentView, article_id=self.article.pk)
+
+    async def test_taxonomy_reads(self):
+        await self.assert_same(CategoryListCreateView, AsyncCategoryView)
+        await self.assert_same(CategoryDetailView, AsyncCategoryView, pk=self.category.pk)
+        await self.assert_same(TagListCreateView, AsyncTagView)
+
+    async def test_errors(self):
+        response = await self.assert_same(ArticleDetailView, AsyncArticleDetailView, pk=999999)
+        self.assertEqual(response.status_code, 404)
+        await self.assert_same(CategoryDetailView, AsyncCategoryView, pk=999999)
+        response = await self.assert_same(
+            ArticleDetailView, AsyncArticleDetailView, headers={'Authorization': 'Bearer not-a-token'}, pk=self.article.pk)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_authenticated_reader(self):
+        token = await sync_to_async(lambda: str(SnapshotRefreshToken.for_user(self.user).access_token))()
+        await self.assert_same(
+            ArticleCommentView, AsyncArticleCommentView, headers={'Authorization': f'Bearer {token}'}, article_id=self.article.pk)
@@ -0,0 +1,95 @@
+import threading
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.models import ActivityLog, Article, Category, Comment, Tag
+from api.modules import bulk
+from api.modules.bulk import TagBulkView
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('bulk-writer', password='x'))
+
+    def test_create_and_update_use_the_default_implementations(self):
+        response = self.client.post('/api/tags/bulk/', [{'name': 'alpha'}, {'name': 'beta'}], format='json')
+        self.assertEqual(response.status_code, 201)
+        ids = [result['id'] for result in response.json()['results']]
+        response = self.client.patch('/api/tags/bulk/', [{'id': ids[0], 'name': 'gamma'}], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Tag.objects.get(pk=ids[0]).name, 'gamma')
+
+    def test_database_error_is_logged_not_echoed(self):
+        error = DatabaseError('relation "api_tag" violates something internal')
+        with mock.patch.object(TagBulkView, 'create_objects', side_effect=error), \
+                self.assertLogs('api.modules.bulk', 'ERROR'):
+            response = self.client.post('/api/tags/bulk/', [{'name': 'delta'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'Batch rejected by the database.'})
+
+
+@override_settings(ACTIVITY_LOG_MODE='sync')
+class BulkDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('bulk-deleter', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(title='Doomed', content='...', author=self.user)
+        root = Comment.objects.create(article=self.article, author=self.user, content='a')
+        Comment.objects.create(article=self.article, author=self.user, parent=root, content='b')
+        Comment.objects.create(article=self.article, author=self.user, content='c')
+
+    def test_article_delete_logs_one_entry_and_skips_cascaded_counters(self):
+        ActivityLog.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete('/api/articles/bulk/', {'ids': [self.article.pk]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(ActivityLog.objects.values_list('action_type', flat=True)), ['ARTICLE_DELETED'])
+        counter_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and (
+            '"comment_count"' in q['sql'] or '"reply_count"' in q['sql'])]
+        self.assertEqual(counter_updates, [])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_database_error_on_delete_is_logged_not_echoed(self):
+        with mock.patch('django.db.models.query.QuerySet.delete', side_effect=DatabaseError('internal detail')), \
+                self.assertLogs('api.modules.bulk', 'ERROR'):
+            response = self.client.delete('/api/articles/bulk/', {'ids': [self.article.pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'Batch rejected by the database.'})
+
+class BulkSlugRaceTests(TransactionTestCase):
+    def test_concurrent_save_of_the_same_title_waits_for_the_batch(self):
+        user = User.objects.create_user('bulk-racer', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+        category = Category.objects.create(name='Races')
+        real = bulk.allocate_slugs
+        saved = []
+
+        def save_same_title():
+            try:
+                saved.append(Article.objects.create(title='Race', content='...', author=user).slug)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=save_same_title)
+
+        def allocate_then_race(*args, **kwargs):
+            slugs = real(*args, **kwargs)
+            # Another writer of the same title arrives between allocation and INSERT
+            writer.start()
+            writer.join(0.5)
+            self.assertTrue(writer.is_alive())
+            return slugs
+
+        items = [{'title': title, 'content': '...', 'categories': [category.pk]} for title in ('Race', 'Other')]
+        with mock.patch.object(bulk, 'allocate_slugs', side_effect=allocate_then_race):
+            response = client.post('/api/articles/bulk/', items, format='json')
+        writer.join()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(saved, ['race-2'])
+        self.assertEqual(sorted(Article.objects.values_list('slug', flat=True)), ['other', 'race', 'race-2'])
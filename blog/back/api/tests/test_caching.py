@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from api.caching import get_generation
+from api.checks import check_response_cache
+from api.models import Article, Category
+from api.modules.async_reads import AsyncArticleDetailView
+
+
+@override_settings(RESPONSE_CACHE=True)
+class GenerationBumpTests(TestCase):
+    def test_generation_is_bumped_after_commit(self):
+        before = get_generation('category')
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Pending')
+            # Still inside the writer's transaction: readers keep the old generation
+            self.assertEqual(get_generation('category'), before)
+        self.assertGreater(get_generation('category'), before)
+
+    def test_category_list_is_served_from_cache_until_a_write_commits(self):
+        self.assertEqual(self.client.get('/api/categories/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.client.get('/api/categories/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Fresh')
+        names = [category['name'] for category in self.client.get('/api/categories/').json()]
+        self.assertIn('Fresh', names)
+
+
+class ConditionalArticleGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('etag-writer', password='x')
+        cls.article = Article.objects.create(title='Validators', content='...', author=author)
+
+    def assert_revalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.get('ETag'))
+        self.assertIsNotNone(response.get('Last-Modified'))
+        revalidated = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        return response
+
+    @override_settings(RESPONSE_CACHE=False)
+    def test_validators_without_the_response_cache(self):
+        response = self.assert_revalidates(f'/api/articles/{self.article.pk}/')
+        # One single-column query, no load and no serialization
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/articles/{self.article.pk}/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(self.client.get(f'/api/articles/{self.article.pk}/', headers={
+            'If-Modified-Since': response['Last-Modified']}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = 'Validators, edited'
+            self.article.save()
+        changed = self.client.get(f'/api/articles/{self.article.pk}/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['title'], 'Validators, edited')
+
+    @override_settings(RESPONSE_CACHE=False)
+    def test_missing_article_is_404_without_the_response_cache(self):
+        self.assertEqual(self.client.get('/api/articles/999999/').status_code, 404)
+
+    @override_settings(RESPONSE_CACHE=True)
+    def test_validators_with_the_response_cache(self):
+        self.assert_revalidates(f'/api/articles/{self.article.pk}/')
+        self.assert_revalidates(f'/api/articles/{self.article.slug}/')
+
+    @override_settings(RESPONSE_CACHE=False)
+    async def test_async_view_answers_conditional_gets(self):
+        view = AsyncArticleDetailView.as_view()
+        response = await view(RequestFactory().get('/'), pk=self.article.pk)
+        self.assertEqual(response.status_code, 200)
+        revalidated = await view(RequestFactory().get('/', headers={'If-None-Match': response['ETag']}), pk=self.article.pk)
+        self.assertEqual(revalidated.status_code, 304)
+
+
+class ResponseCacheCheckTests(SimpleTestCase):
+    @override_settings(RESPONSE_CACHE=False)
+    def test_warns_while_the_response_cache_is_off(self):
+        self.assertEqual([warning.id for warning in check_response_cache(None)], ['api.W001'])
+
+    @override_settings(RESPONSE_CACHE=True)
+    def test_silent_with_the_response_cache_on(self):
+        self.assertEqual(check_response_cache(None), [])
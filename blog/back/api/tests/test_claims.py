@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from api.claims import PERMISSION_CLAIM, SnapshotRefreshToken, request_is_staff
+from api.revocation import revocation_list
+
+
+class PermissionSnapshotTests(TestCase):
+    def setUp(self):
+        revocation_list.clear()
+        self.user = User.objects.create_user('editor', password='x', is_staff=True)
+        self.refresh = SnapshotRefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+
+    def tearDown(self):
+        revocation_list.clear()
+
+    def request(self, token):
+        return SimpleNamespace(user=self.user, auth=token)
+
+    def test_current_snapshot_is_read_from_the_token(self):
+        self.assertTrue(self.access[PERMISSION_CLAIM]['is_staff'])
+        request_is_staff(self.request(self.access))
+        with self.assertNumQueries(0):
+            self.assertTrue(request_is_staff(self.request(self.access)))
+
+    def test_role_change_makes_outstanding_snapshots_stale(self):
+        self.user.is_staff = False
+        self.user.save()
+        # The old token still says staff, but is no longer trusted for it
+        self.assertTrue(self.access[PERMISSION_CLAIM]['is_staff'])
+        self.assertFalse(request_is_staff(self.request(self.access)))
+        # A refresh hands out the new snapshot
+        self.assertFalse(self.refresh.access_token[PERMISSION_CLAIM]['is_staff'])
+
+    def test_group_change_makes_outstanding_snapshots_stale(self):
+        self.user.groups.add(Group.objects.create(name='Reviewers'))
+        self.assertTrue(revocation_list.claims_stale(self.access))
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.models import COMMENT_MAX_DEPTH, COMMENT_PATH_WIDTH, Article, Comment
+from api.serializers import CommentSerializer
+
+
+class CommentPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('writer', password='x')
+        cls.article = Article.objects.create(title='Threads', content='...', author=cls.user)
+
+    def reply_chain(self, length):
+        parent = None
+        for _ in range(length):
+            parent = Comment.objects.create(article=self.article, author=self.user, parent=parent, content='re')
+        return parent
+
+    def test_deep_reply_is_inserted_with_its_path(self):
+        leaf = self.reply_chain(40)
+        with self.assertNumQueries(1):
+            path = Comment.objects.values_list('path', flat=True).get(pk=leaf.pk)
+        self.assertEqual(path, leaf.path)
+        self.assertEqual(len(path), 40 * (COMMENT_PATH_WIDTH + 1))
+        self.assertEqual(leaf.depth, 39)
+
+    def test_insert_writes_path_without_follow_up_update(self):
+        root = self.reply_chain(1)
+        with CaptureQueriesContext(connection) as queries:
+            Comment.objects.create(article=self.article, author=self.user, parent=root, content='re')
+        path_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and '"path"' in q['sql']]
+        self.assertEqual(path_updates, [])
+
+    def test_serializer_rejects_replies_past_max_depth(self):
+        leaf = self.reply_chain(COMMENT_MAX_DEPTH + 1)
+        serializer = CommentSerializer(data={'article': self.article.pk, 'parent': leaf.pk, 'content': 'too deep'})
+        self.assertFalse(serializer.is_valid())
+
+    def test_descendants_of_unsaved_comment_is_empty(self):
+        self.reply_chain(2)
+        self.assertFalse(Comment(article=self.article, author=self.user, content='x').descendants().exists())
+
+
+class CommentMoveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('mover', password='x')
+        cls.article = Article.objects.create(title='Moves', content='...', author=cls.user)
+        cls.other = Article.objects.create(title='Elsewhere', content='...', author=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.root = Comment.objects.create(article=self.article, author=self.user, content='root')
+        self.child = Comment.objects.create(article=self.article, author=self.user, parent=self.root, content='re')
+
+    def test_comment_cannot_move_under_its_own_reply(self):
+        response = self.client.patch(f'/api/comments/{self.root.pk}/', {'parent': self.child.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.root.parent = self.child
+        with self.assertRaises(ValidationError):
+            self.root.save()
+        self.assertEqual(len(self.client.get(f'/api/articles/{self.article.pk}/comments/').json()), 1)
+
+    def test_parent_must_belong_to_the_same_article(self):
+        foreign = Comment.objects.create(article=self.other, author=self.user, content='elsewhere')
+        response = self.client.patch(f'/api/comments/{self.child.pk}/', {'parent': foreign.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(f'/api/comments/{self.child.pk}/', {'article': self.other.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.child.parent = foreign
+        with self.assertRaises(ValidationError):
+            self.child.save()
+        self.article.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.article.comment_count, self.other.comment_count), (2, 1))
@@ -0,0 +1,69 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from api.claims import SnapshotRefreshToken
+from api.db_router import PIN_COOKIE, USER_PIN_KEY, PrimaryReplicaRouter, RoutingState, routing_state
+from api.models import RevokedToken, Tag
+
+
+@mock.patch('api.db_router.replica_aliases', return_value=['replica1'])
+class RoutingTests(SimpleTestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def route(self, request, model=Tag):
+        token = routing_state.set(RoutingState(request))
+        try:
+            return PrimaryReplicaRouter().db_for_read(model)
+        finally:
+            routing_state.reset(token)
+
+    def test_safe_reads_go_to_a_replica(self, replicas):
+        self.assertEqual(self.route(RequestFactory().get('/api/tags/')), 'replica1')
+
+    def test_unsafe_methods_and_primary_models_read_the_primary(self, replicas):
+        self.assertEqual(self.route(RequestFactory().post('/api/tags/')), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.route(RequestFactory().get('/api/tags/'), RevokedToken), DEFAULT_DB_ALIAS)
+
+    def test_reads_after_a_write_stay_on_the_primary(self, replicas):
+        state = RoutingState(RequestFactory().get('/api/tags/'))
+        self.assertEqual(state.read_alias(), 'replica1')
+        state.mark_write()
+        self.assertEqual(state.read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_pinned_clients_read_the_primary(self, replicas):
+        request = RequestFactory().get('/api/tags/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.route(request), DEFAULT_DB_ALIAS)
+
+        token = AccessToken()
+        token['user_id'] = 42
+        cache.set(USER_PIN_KEY.format(42), 1, 5)
+        self.assertEqual(self.route(RequestFactory().get('/api/tags/', headers={'Authorization': f'Bearer {token}'})), DEFAULT_DB_ALIAS)
+
+
+@mock.patch('api.middleware.replica_aliases', return_value=['replica1'])
+@mock.patch('api.db_router.replica_aliases', return_value=['replica1'])
+class PinningTests(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_write_pins_the_authenticated_user(self, *replicas):
+        user = User.objects.create_user('pinned', password='x', is_staff=True)
+        token = SnapshotRefreshToken.for_user(user).access_token
+        response = self.client.post('/api/tags/', {'name': 'Pinned'}, headers={'Authorization': f'Bearer {token}'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertIsNotNone(cache.get(USER_PIN_KEY.format(user.pk)))
+
+    def test_forged_token_pins_nobody(self, *replicas):
+        victim = User.objects.create_user('victim', password='x')
+        forged = AccessToken()
+        forged['user_id'] = victim.pk
+        header = str(forged)[:-4] + 'AAAA'
+        response = self.client.post('/api/tags/', {'name': 'Forged'}, headers={'Authorization': f'Bearer {header}'})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertIsNone(cache.get(USER_PIN_KEY.format(victim.pk)))
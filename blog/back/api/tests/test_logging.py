@@ -0,0 +1,35 @@
+import json
+import logging
+import logging.config
+import os
+import tempfile
+from django.conf import settings
+from django.test import SimpleTestCase
+from api.structured_logging import BackgroundHandler
+
+
+class LoggingConfigTests(SimpleTestCase):
+    def tearDown(self):
+        for handler in logging.getLogger().handlers:
+            handler.close()
+        logging.config.dictConfig(settings.LOGGING)
+
+    def test_settings_logging_configures(self):
+        logging.config.dictConfig(settings.LOGGING)
+        handlers = logging.getLogger().handlers
+        self.assertTrue(handlers)
+        self.assertTrue(all(isinstance(handler, BackgroundHandler) for handler in handlers))
+
+    def test_file_handler_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'log.jsonl')
+            config = dict(settings.LOGGING, handlers={
+                'file': {**settings.LOGGING['handlers']['file'], 'filename': path},
+            }, root={'handlers': ['file'], 'level': 'INFO'})
+            logging.config.dictConfig(config)
+            logging.getLogger('api.tests').warning('hello %s', 'world', extra={'comment_id': 7})
+            logging.getLogger().handlers[0].close()
+            with open(path) as f:
+                [entry] = [json.loads(line) for line in f]
+        self.assertEqual(entry['message'], 'hello world')
+        self.assertEqual(entry['comment_id'], 7)
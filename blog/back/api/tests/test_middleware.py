@@ -0,0 +1,10 @@
+from django.core.handlers.asgi import ASGIHandler
+from django.test import SimpleTestCase, override_settings
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_asgi_stack_adapts_no_middleware(self):
+        # With DEBUG on, Django logs each sync-only middleware it wraps for the async stack
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
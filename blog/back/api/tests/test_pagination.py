@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from api.models import Article
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('pager', password='x')
+        for number in range(7):
+            Article.objects.create(title=f'Tie {number}', content='...', author=author)
+        # Every article shares one created_at: only the id tells them apart
+        Article.objects.update(created_at=timezone.now())
+        cls.expected = list(Article.objects.order_by('-id').values_list('pk', flat=True))
+
+    def test_pages_are_stable_when_created_at_ties(self):
+        pages, url = [], '/api/articles/?page_size=3'
+        while url:
+            body = self.client.get(url).json()
+            pages.append([article['id'] for article in body['results']])
+            url = body['next']
+        self.assertEqual(pages, [self.expected[:3], self.expected[3:6], self.expected[6:]])
+
+        # And back again from the last page
+        previous = body['previous']
+        self.assertEqual([article['id'] for article in self.client.get(previous).json()['results']], self.expected[3:6])
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get('/api/articles/?cursor=not-a-cursor').status_code, 404)
@@ -0,0 +1,30 @@
+import time
+from django.test import SimpleTestCase
+from api.revocation import RevocationList
+
+
+class RevocationListTests(SimpleTestCase):
+    def setUp(self):
+        self.revocations = RevocationList()
+        # Answer from memory only: no sync with the database
+        self.revocations._checked_at = time.monotonic() + 3600
+
+    def test_forced_sign_out_spares_tokens_issued_in_the_same_second(self):
+        revoked_at = 1_700_000_000.75
+        self.revocations.add(None, 7, revoked_at, revoked_at + 3600)
+        self.assertTrue(self.revocations.is_revoked({'user_id': 7, 'iat': 1_699_999_999}))
+        self.assertFalse(self.revocations.is_revoked({'user_id': 7, 'iat': 1_700_000_000}))
+
+    def test_claims_issued_in_the_second_of_a_role_change_are_stale(self):
+        changed_at = 1_700_000_000.75
+        self.revocations.add(None, 7, changed_at, changed_at + 3600, claims_only=True)
+        self.assertTrue(self.revocations.claims_stale({'user_id': 7, 'iat': 1_700_000_000}))
+        self.assertFalse(self.revocations.claims_stale({'user_id': 7, 'iat': 1_700_000_001}))
+
+    def test_purge_drops_expired_entries(self):
+        now = time.time()
+        self.revocations.add('old', 7, now - 20, now - 10)
+        self.revocations.add('live', 7, now - 20, now + 60)
+        self.revocations._purge()
+        self.assertFalse(self.revocations.is_revoked({'jti': 'old'}))
+        self.assertTrue(self.revocations.is_revoked({'jti': 'live'}))
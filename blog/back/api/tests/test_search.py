@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api.models import Article, Category, Tag
+
+
+class SearchVectorRelationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('searcher', password='x')
+        self.article = Article.objects.create(title='Harbour notes', content='Boats.', author=self.user)
+
+    def search(self, text):
+        return [article['id'] for article in self.client.get('/api/articles/search/', {'q': text}).json()]
+
+    def test_deleted_tag_no_longer_matches(self):
+        tag = Tag.objects.create(name='zanzibar')
+        self.article.tags.add(tag)
+        self.assertEqual(self.search('zanzibar'), [self.article.pk])
+        tag.delete()
+        self.assertEqual(self.search('zanzibar'), [])
+
+    def test_bulk_deleted_category_no_longer_matches(self):
+        category = Category.objects.create(name='lighthouses')
+        self.article.categories.add(category)
+        self.assertEqual(self.search('lighthouses'), [self.article.pk])
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.delete('/api/categories/bulk/', {'ids': [category.pk]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search('lighthouses'), [])
@@ -0,0 +1,23 @@
+from unittest import mock
+from django.db import IntegrityError
+from django.test import TestCase
+from api import slugs
+from api.models import Tag
+
+
+class SlugRaceTests(TestCase):
+    def test_save_retries_when_a_concurrent_writer_took_the_slug(self):
+        Tag.objects.create(name='Racing slugs')
+        real = slugs.allocate_slug
+        # The first allocation ran before the other writer committed, so it returns the taken slug
+        allocations = iter(['racing-slugs'])
+        with mock.patch.object(slugs, 'allocate_slug', side_effect=lambda *a, **kw: next(allocations, None) or real(*a, **kw)):
+            tag = Tag.objects.create(name='Racing slugs!')
+        self.assertEqual(tag.slug, 'racing-slugs-2')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        Tag.objects.create(name='Unique name')
+        with mock.patch.object(slugs, 'allocate_slug', wraps=slugs.allocate_slug) as allocate:
+            with self.assertRaises(IntegrityError):
+                Tag.objects.create(name='Unique name')
+        self.assertEqual(allocate.call_count, 1)
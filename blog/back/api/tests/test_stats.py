@@ -0,0 +1,26 @@
+from django.test import TestCase, override_settings
+from api import stats
+from api.models import DailyCounter, SiteCounter, User
+
+
+@override_settings(STATS_COUNTER_SHARDS=4)
+class ShardedCounterTests(TestCase):
+    def setUp(self):
+        SiteCounter.objects.all().delete()
+        DailyCounter.objects.all().delete()
+
+    def test_increments_spread_over_shards_and_sum_on_read(self):
+        for _ in range(40):
+            stats.record_created('articles')
+        stats.record_deleted('articles', 5)
+        self.assertGreater(SiteCounter.objects.filter(name='articles').count(), 1)
+        self.assertLessEqual(set(SiteCounter.objects.values_list('shard', flat=True)), {0, 1, 2, 3})
+        self.assertEqual(stats.site_totals()['articles'], 35)
+        self.assertEqual(stats.daily_series(1)['articles'][0]['count'], 40)
+
+    def test_reconcile_replaces_every_shard(self):
+        for _ in range(10):
+            stats.record_created('users')
+        stats.reconcile(days=1)
+        self.assertEqual(SiteCounter.objects.filter(name='users').count(), 1)
+        self.assertEqual(stats.site_totals()['users'], User.objects.count())
@@ -0,0 +1,67 @@
+import threading
+from unittest import mock
+from django.db import DatabaseError, transaction
+from django.test import SimpleTestCase, TestCase
+from api.models import Tag
+from api.suggest import PrefixIndex, suggest_index
+
+
+class PrefixIndexRebuildTests(SimpleTestCase):
+    def test_expired_index_is_rebuilt_by_one_thread(self):
+        index = PrefixIndex()
+        index._built_at = 0
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_rebuild():
+            calls.append(threading.get_ident())
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(index, 'rebuild', side_effect=slow_rebuild):
+            builder = threading.Thread(target=index.ensure_built)
+            builder.start()
+            started.wait(5)
+            # Others see the rebuild in progress and return at once, serving the old index
+            for _ in range(5):
+                index.ensure_built()
+            release.set()
+            builder.join(5)
+        self.assertEqual(len(calls), 1)
+
+    def test_changes_made_during_a_rebuild_are_replayed(self):
+        index = PrefixIndex()
+
+        class Rows:
+            def values_list(self, *fields):
+                # Committed after the scan's snapshot was taken
+                index.update('tag', 2, 'Late arrival')
+                index.remove('tag', 1)
+                return [(1, 'Early bird')]
+
+        with mock.patch.dict('api.suggest.SUGGEST_SOURCES', {mock.Mock(objects=Rows()): ('tag', 'name')}, clear=True):
+            index.rebuild()
+        self.assertEqual([hit['id'] for hit in index.search('late', 10)], [2])
+        self.assertEqual(index.search('early', 10), [])
+
+
+class SuggestSignalTests(TestCase):
+    def setUp(self):
+        suggest_index.rebuild()
+
+    def test_rolled_back_save_leaves_no_suggestion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Tag.objects.create(name='Phantom')
+                    raise DatabaseError('rolled back')
+            except DatabaseError:
+                pass
+        self.assertEqual(suggest_index.search('phantom', 10), [])
+
+    def test_committed_save_is_suggested(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name='Substantial')
+            # Not before the commit
+            self.assertEqual(suggest_index.search('substantial', 10), [])
+        self.assertEqual([hit['id'] for hit in suggest_index.search('substantial', 10)], [tag.pk])
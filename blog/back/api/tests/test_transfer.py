@@ -0,0 +1,48 @@
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+from api.claims import SnapshotRefreshToken
+from api.transfer import Importer, export_records
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('export-admin', password='secret-pass')
+
+    def exported_user(self, **kwargs):
+        return next(r for r in export_records(**kwargs) if r['type'] == 'user' and r['id'] == self.admin.pk)
+
+    def test_password_hashes_only_on_request(self):
+        self.assertNotIn('password', self.exported_user())
+        self.assertEqual(self.exported_user(include_passwords=True)['password'], self.admin.password)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        token = await sync_to_async(lambda: str(SnapshotRefreshToken.for_user(self.admin).access_token))()
+        response = await self.async_client.get('/api/admin/export/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        lines = [line async for chunk in response.streaming_content for line in chunk.decode().splitlines()]
+        self.assertEqual(json.loads(lines[0])['type'], 'meta')
+
+
+class ImporterPasswordTests(TestCase):
+    def user_record(self, **extra):
+        return {'type': 'user', 'id': 10_000_001, 'username': 'imported', 'email': '', 'first_name': '',
+                'last_name': '', 'is_staff': False, 'is_superuser': False, 'is_active': True,
+                'date_joined': '2026-01-01T00:00:00Z', **extra}
+
+    def test_exported_hash_is_kept(self):
+        importer = Importer()
+        importer.add(self.user_record(password='pbkdf2_sha256$1$salt$hash'))
+        [user] = importer.buffers['user']
+        self.assertEqual(user.password, 'pbkdf2_sha256$1$salt$hash')
+        self.assertEqual(importer.without_password, 0)
+
+    def test_missing_hash_is_counted_and_unusable(self):
+        importer = Importer()
+        importer.add(self.user_record())
+        [user] = importer.buffers['user']
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(importer.without_password, 1)
@@ -0,0 +1,251 @@
+import json
+from collections import Counter
+from asgiref.sync import sync_to_async
+from itertools import groupby
+from operator import itemgetter
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from api.models import Article, Category, Comment, Tag, User, UserProfile
+from api.signals import bulk_saved
+
+# NDJSON export of the whole blog: one JSON object per line, each with a "type".
+# Lines come in dependency order (users, categories, tags, then every article followed by its
+# comment tree in path order), so an import can write them in a single forward pass.
+# Password hashes are only included on request; users exported without one are imported with
+# an unusable password and have to reset it.
+FORMAT_VERSION = 1
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser', 'is_active', 'date_joined')
+CATEGORY_FIELDS = ('id', 'name', 'description', 'slug', 'created_at', 'updated_at')
+TAG_FIELDS = ('id', 'name', 'slug')
+ARTICLE_FIELDS = ('id', 'title', 'slug', 'content', 'author_id', 'created_at', 'updated_at')
+COMMENT_FIELDS = ('id', 'article_id', 'author_id', 'parent_id', 'content', 'path', 'depth', 'created_at', 'updated_at')
+DATETIME_FIELDS = {'date_joined', 'created_at', 'updated_at'}
+
+DEFAULT_CHUNK_SIZE = 2000
+# PostgreSQL accepts at most 65535 bind parameters per statement
+MAX_INSERT_PARAMS = 60000
+
+
+def _rows_by_article(queryset, chunk_size):
+    """
+    Reader over rows ordered by article_id: take(article_id) returns that article's rows.
+    Lets articles be merged with their relations and comments while every stream is read
+    through its own server-side cursor, chunk by chunk.
+    """
+    groups = groupby(queryset.iterator(chunk_size=chunk_size), key=itemgetter('article_id'))
+    current = next(groups, None)
+
+    def take(article_id):
+        nonlocal current
+        while current is not None and current[0] < article_id:
+            current = next(groups, None)
+        if current is None or current[0] != article_id:
+            return []
+        rows = list(current[1])
+        current = next(groups, None)
+        return rows
+
+    return take
+
+
+def export_records(chunk_size=DEFAULT_CHUNK_SIZE, include_passwords=False):
+    """
+    Every record of the blog. All queries run in one REPEATABLE READ, read-only transaction, so
+    the export is a single snapshot: rows written meanwhile cannot leave an article pointing at
+    a tag or a comment at a parent the export did not see.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            # Must be the transaction's first statement; inside a caller's transaction, its
+            # isolation level applies
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield from _export_records(chunk_size, include_passwords)
+
+
+def _export_records(chunk_size, include_passwords):
+    yield {'type': 'meta', 'version': FORMAT_VERSION, 'exported_at': timezone.now()}
+
+    fields = USER_FIELDS + ('password',) if include_passwords else USER_FIELDS
+    users = User.objects.order_by('pk').values(*fields, 'profile__bio', 'profile__user_type')
+    for row in users.iterator(chunk_size=chunk_size):
+        row['bio'] = row.pop('profile__bio')
+        row['user_type'] = row.pop('profile__user_type')
+        yield {'type': 'user', **row}
+    for kind, model, fields in (('category', Category, CATEGORY_FIELDS), ('tag', Tag, TAG_FIELDS)):
+        for row in model.objects.order_by('pk').values(*fields).iterator(chunk_size=chunk_size):
+            yield {'type': kind, **row}
+
+    categories = _rows_by_article(
+        Article.categories.through.objects.order_by('article_id').values('article_id', 'category_id'), chunk_size)
+    tags = _rows_by_article(
+        Article.tags.through.objects.order_by('article_id').values('article_id', 'tag_id'), chunk_size)
+    comments = _rows_by_article(
+        Comment.objects.order_by('article_id', 'path').values(*COMMENT_FIELDS), chunk_size)
+    for row in Article.objects.order_by('pk').values(*ARTICLE_FIELDS).iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'article',
+            **row,
+            'categories': [r['category_id'] for r in categories(row['id'])],
+            'tags': [r['tag_id'] for r in tags(row['id'])],
+        }
+        for comment in comments(row['id']):
+            yield {'type': 'comment', **comment}
+
+
+async def aiter_sync(iterator):
+    """
+    A sync iterator as an async one, for StreamingHttpResponse under ASGI (which would otherwise
+    read a sync iterator to the end into memory first). Each step runs in the request's sync
+    thread, so a transaction opened by the iterator stays on one connection.
+    """
+    iterator = iter(iterator)
+    done = object()
+    step = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (item := await step(iterator, done)) is not done:
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def iter_ndjson(records, lines_per_chunk=500):
+    """Encode records as NDJSON, a few hundred lines per yielded string."""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, cls=DjangoJSONEncoder))
+        if len(lines) >= lines_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _insert(model, objs):
+    """
+    bulk_create() without its pre_save step, the way loaddata saves with raw=True: auto_now /
+    auto_now_add would otherwise replace the exported created_at and updated_at.
+    """
+    if not objs:
+        return
+    fields = list(model._meta.concrete_fields)
+    batch_size = max(1, MAX_INSERT_PARAMS // len(fields))
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(objs[start:start + batch_size], fields=fields, raw=True)
+
+
+def _insert_ignoring_conflicts(model, objs):
+    if objs:
+        model._base_manager.bulk_create(objs, ignore_conflicts=True)
+
+
+class Importer:
+    """
+    Loads an export stream into an empty blog (run migrate first), keeping ids and slugs.
+
+    Records are buffered per type and written in chunks. A full buffer flushes every buffer in
+    dependency order, so a comment is never written before its article or parent. Derived
+    state is brought up to date per chunk through bulk_saved (search vectors, caches,
+    suggestions) and once at the end through finish() (comment counters, site statistics,
+    id sequences).
+    """
+    ORDER = ('user', 'category', 'tag', 'article', 'comment')
+    MODELS = {'user': User, 'category': Category, 'tag': Tag, 'article': Article, 'comment': Comment}
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.buffers = {kind: [] for kind in self.ORDER}
+        self.profiles = []
+        self.article_categories = []
+        self.article_tags = []
+        self.counts = Counter()
+        # Users imported without a password hash (exported without --with-passwords)
+        self.without_password = 0
+
+    def add(self, record):
+        record = dict(record)
+        kind = record.pop('type', None)
+        if kind == 'meta':
+            if record.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported export format version {record.get('version')!r}")
+            return
+        if kind not in self.buffers:
+            raise ValueError(f"Unknown record type {kind!r}")
+        for field in DATETIME_FIELDS.intersection(record):
+            if isinstance(record[field], str):
+                record[field] = parse_datetime(record[field])
+
+        if kind == 'user':
+            profile = {'bio': record.pop('bio', ''), 'user_type': record.pop('user_type', None) or 'regular'}
+            if not record.get('password'):
+                # Exported without its hash: the user has to reset it before signing in
+                record['password'] = make_password(None)
+                self.without_password += 1
+            self.buffers[kind].append(User(**record))
+            self.profiles.append(UserProfile(user_id=record['id'], **profile))
+        elif kind == 'article':
+            through_categories = Article.categories.through
+            through_tags = Article.tags.through
+            self.article_categories.extend(
+                through_categories(article_id=record['id'], category_id=pk) for pk in record.pop('categories', []))
+            self.article_tags.extend(
+                through_tags(article_id=record['id'], tag_id=pk) for pk in record.pop('tags', []))
+            self.buffers[kind].append(Article(**record))
+        else:
+            self.buffers[kind].append(self.MODELS[kind](**record))
+
+        if len(self.buffers[kind]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for kind in self.ORDER:
+            objs, self.buffers[kind] = self.buffers[kind], []
+            if not objs:
+                continue
+            model = self.MODELS[kind]
+            _insert(model, objs)
+            self.counts[str(model._meta.verbose_name_plural).lower()] += len(objs)
+            if kind == 'user':
+                _insert_ignoring_conflicts(UserProfile, self.profiles)
+                self.profiles = []
+            elif kind == 'article':
+                _insert_ignoring_conflicts(Article.categories.through, self.article_categories)
+                _insert_ignoring_conflicts(Article.tags.through, self.article_tags)
+                self.article_categories, self.article_tags = [], []
+            if kind in ('category', 'tag', 'article'):
+                bulk_saved.send(sender=model, instances=objs, created=True, user=None)
+
+    def finish(self):
+        from api.management.commands.recount_comments import recount_comment_counters
+        from api.stats import reconcile
+        self.flush()
+        recount_comment_counters()
+        reconcile()
+        # Rows were inserted with explicit ids; move the sequences past them
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(self.MODELS.values()) + [UserProfile]):
+                cursor.execute(sql)
+        return self.counts
+
+
+def import_lines(lines, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Import every line and finish(); returns the Importer for its counts."""
+    importer = Importer(chunk_size)
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            importer.add(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {str(e)}") from e
+    importer.finish()
+    return importer
@@ -1,11 +1,16 @@
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .modules.articles import ArticleViewSet, ArticleListCreateView, ArticleDetailView, ArticleSearchView, ArticleCommentView
+from .modules.articles import (ArticleViewSet, ArticleListCreateView, ArticleDetailView, ArticleSearchView, ArticleCommentView,
+                               ArticleSlugDetailView, ArticleSlugCommentView)
 from .modules.comments import CommentViewSet, CommentListCreateView, CommentDetailView
 from .modules.categories import CategoryListCreateView, CategoryDetailView
 from .modules.tags import TagListCreateView, TagDetailView
-from .modules.users import UserListView, UserDetailView
-from .modules.admin import SiteStatisticsView, ActivityLogListView
+from .modules.users import UserListView, UserDetailView, UserSignOutView
+from .modules.admin import SiteStatisticsView, ActivityLogListView, CacheStatsView, DatabasePoolStatsView, ExportView
+from .modules.suggest import SuggestView
+from .modules.bulk import ArticleBulkView, CategoryBulkView, TagBulkView
+from .modules.async_reads import (AsyncArticleListView, AsyncArticleDetailView, AsyncArticleCommentView,
+                                  AsyncCategoryView, AsyncTagView, read_or_write)
 from api.views import (get_root, RegisterView, LoginView, LogoutView, TokenRefreshViewEx, UserProfileView)
 from .views import GroupListView
 
@@ -19,14 +24,21 @@ comment_add_reply = CommentViewSet.as_view({
 
 urlpatterns = [
     path('docs/', get_root, name='api-docs'),
-    path('categories/', CategoryListCreateView.as_view(), name='category-list'),
-    path('categories/<int:pk>/', CategoryDetailView.as_view(), name='category-detail'),
-    path('tags/', TagListCreateView.as_view(), name='tag-list'),
-    path('tags/<int:pk>/', TagDetailView.as_view(), name='tag-detail'),
-    path('articles/', ArticleListCreateView.as_view(), name='article-list'),
-    path('articles/<int:pk>/', ArticleDetailView.as_view(), name='article-detail'),
+    path('categories/', read_or_write(AsyncCategoryView, CategoryListCreateView), name='category-list'),
+    path('categories/bulk/', CategoryBulkView.as_view(), name='category-bulk'),
+    path('categories/<int:pk>/', read_or_write(AsyncCategoryView, CategoryDetailView), name='category-detail'),
+    path('tags/', read_or_write(AsyncTagView, TagListCreateView), name='tag-list'),
+    path('tags/bulk/', TagBulkView.as_view(), name='tag-bulk'),
+    path('tags/<int:pk>/', read_or_write(AsyncTagView, TagDetailView), name='tag-detail'),
+    path('articles/', read_or_write(AsyncArticleListView, ArticleListCreateView), name='article-list'),
+    path('articles/bulk/', ArticleBulkView.as_view(), name='article-bulk'),
+    path('articles/<int:pk>/', read_or_write(AsyncArticleDetailView, ArticleDetailView), name='article-detail'),
     path('articles/search/', ArticleSearchView.as_view(), name='article-search'),
-    path('articles/<int:article_id>/comments/', ArticleCommentView.as_view(), name='article-comments'),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+    path('articles/<int:article_id>/comments/', read_or_write(AsyncArticleCommentView, ArticleCommentView), name='article-comments'),
+    # After every other articles/... route: Article.RESERVED_SLUGS keeps slugs from shadowing them
+    path('articles/<slug:slug>/', read_or_write(AsyncArticleDetailView, ArticleSlugDetailView), name='article-detail-slug'),
+    path('articles/<slug:slug>/comments/', read_or_write(AsyncArticleCommentView, ArticleSlugCommentView), name='article-comments-slug'),
     path('comments/', CommentListCreateView.as_view(), name='comment-list'),
     path('comments/<int:id>/', CommentDetailView.as_view(), name='comment-detail'),
     path('users/me/', UserProfileView.as_view(), name='current-user'),
@@ -34,9 +46,13 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshViewEx.as_view(), name='token_refresh'),
     path('admin/users/', UserListView.as_view(), name='admin-user-list'),
     path('admin/users/<int:pk>/', UserDetailView.as_view(), name='admin-user-detail'),
+    path('admin/users/<int:pk>/sign-out/', UserSignOutView.as_view(), name='admin-user-sign-out'),
     path('admin/groups/', UserListView.as_view(), name='admin-group-list'),
     path('admin/activity/', ActivityLogListView.as_view(), name='admin-activity-log'),
     path('admin/stats/', SiteStatisticsView.as_view(), name='admin-site-stats'),
+    path('admin/cache/', CacheStatsView.as_view(), name='admin-cache-stats'),
+    path('admin/db/', DatabasePoolStatsView.as_view(), name='admin-db-stats'),
+    path('admin/export/', ExportView.as_view(), name='admin-export'),
     path('login/', LoginView.as_view(), name='login'),
     path('register/', RegisterView.as_view(), name='register'),
     path('groups/', GroupListView.as_view(), name='group-list'),
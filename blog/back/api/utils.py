@@ -7,10 +7,10 @@ logger = logging.getLogger(__name__)
 
 def custom_exception_handler(exc, context):
     response = exception_handler(exc, context)
-    logger.error(f"Exception: {str(exc)}, Type: {type(exc)}")
+    logger.error("Exception: %s, Type: %s", exc, type(exc))
 
     if 'token_not_valid' in str(exc):
-        logger.info(f"Token validation error: {str(exc)}")
+        logger.info("Token validation error: %s", exc)
         error_detail = {
             'error': 'Authentication credentials are invalid or expired',
             'detail': 'Please log in again to obtain new credentials',
@@ -19,11 +19,11 @@ def custom_exception_handler(exc, context):
         error_str = str(exc).lower()
         if 'signature' in error_str:
             error_detail['error'] = 'Token signature verification failed'
-            logger.warning(f"Token signature validation failed: {str(exc)}")
+            logger.warning("Token signature validation failed: %s", exc)
         elif 'expired' in error_str:
             error_detail['error'] = 'Token has expired'
             error_detail['code'] = 'token_expired'
-            logger.info(f"Token expired: {str(exc)}")
+            logger.info("Token expired: %s", exc)
         
         return Response(
             error_detail, 
@@ -31,18 +31,18 @@ def custom_exception_handler(exc, context):
         )
 
     if response is None:
-        logger.error(f"Unhandled API Exception: {str(exc)}")
+        logger.error("Unhandled API Exception: %s", exc)
         return Response(
             {'error': 'Internal server error', 'detail': str(exc)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-    logger.debug(f"API Error Response: {response.data}")
+    logger.debug("API Error Response: %s", response.data)
     return response
 
 def get_tokens_for_user(user):
-    from rest_framework_simplejwt.tokens import RefreshToken
-    refresh = RefreshToken.for_user(user)
+    from api.claims import SnapshotRefreshToken
+    refresh = SnapshotRefreshToken.for_user(user)
     
     return {
         'refresh': str(refresh),
@@ -67,5 +67,5 @@ def decode_token(token):
         logger.warning("Invalid token")
         return None
     except Exception as e:
-        logger.error(f"Token decode error: {str(e)}")
+        logger.error("Token decode error: %s", e)
         return None
@@ -4,10 +4,10 @@ from django.shortcuts import render, get_object_or_404
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth.models import User, Group
-from .models import UserProfile, ActivityLog
+from .models import UserProfile
 from .serializers import (
     UserProfileSerializer, RegisterSerializer,
-    LoginSerializer, UserSerializer, GroupSerializer, ActivityLogSerializer
+    LoginSerializer, UserSerializer, GroupSerializer
 )
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view
@@ -17,6 +17,9 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework.decorators import permission_classes as decorator_permission_classes
 from .utils import get_tokens_for_user
+from .revocation import revocation_list, revoke_token
+from .claims import request_is_staff
+from .modules.admin import ActivityLogListView  # noqa: F401  (moved; kept importable from here)
 
 @api_view(['GET'])
 @decorator_permission_classes([permissions.AllowAny])
@@ -33,13 +36,13 @@ def get_root(request, format=None):
 
 class IsAdminUser(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user and request.user.is_staff
+        return request_is_staff(request)
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return request.user and request.user.is_staff
+        return request_is_staff(request)
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -79,22 +82,30 @@ class LoginView(generics.GenericAPIView):
 class TokenRefreshViewEx(TokenRefreshView):
     def post(self, request, *args, **kwargs):
         try:
+            refresh_token = request.data.get('refresh')
+            if refresh_token and revocation_list.is_revoked(RefreshToken(refresh_token)):
+                return Response({"error": "Failed to refresh token", "detail": "Token has been revoked"}, status=status.HTTP_401_UNAUTHORIZED)
             return super().post(request, *args, **kwargs)
         except Exception as e:
-            logger.error(f"Token refresh failed: {str(e)}")
+            logger.error("Token refresh failed: %s", e)
             return Response({"error": "Failed to refresh token", "detail": str(e)}, status=status.HTTP_401_UNAUTHORIZED)
 
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
+        # The access token used for this request stops working at once, not when it expires
+        if request.auth is not None:
+            revoke_token(request.auth)
         refresh_token = request.data.get('refresh')
         if refresh_token:
             try:
                 token = RefreshToken(refresh_token)
-                token.blacklist()
+                revoke_token(token)
+                if hasattr(token, 'blacklist'):
+                    token.blacklist()
             except Exception as e:
-                logger.error(f"Failed to blacklist token: {str(e)}")
+                logger.error("Failed to blacklist token: %s", e)
                 return Response({"error": "Failed to logout", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({"message": "Successfully logged out"}, status=status.HTTP_200_OK)
 
@@ -107,7 +118,7 @@ class IsCommentAuthorOrAdminOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user or request.user.is_staff
+        return obj.author_id == request.user.id or request_is_staff(request)
 
 class CurrentUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -128,11 +139,6 @@ class GroupListView(generics.ListAPIView):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
-class ActivityLogListView(generics.ListAPIView):
-    queryset = ActivityLog.objects.select_related('user').all().order_by('-timestamp')[:20]
-    serializer_class = ActivityLogSerializer
-    permission_classes = [permissions.IsAdminUser]
-
 class UpdateUserView(APIView):
     def patch(self, request, pk):
         try:
@@ -143,5 +149,5 @@ class UpdateUserView(APIView):
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Failed to update user: {str(e)}")
+            logger.error("Failed to update user: %s", e)
             return Response({"error": "Failed to update user", "detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
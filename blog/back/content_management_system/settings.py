@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'api',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -26,19 +27,64 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 }
 
+# Tokens carry a role snapshot (see api.claims) so permission checks need no queries
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.SnapshotTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.CustomTokenRefreshSerializer',
+}
+
+# Bulk write endpoints (articles/bulk/, tags/bulk/, categories/bulk/); BULK_ATOMIC makes one bad
+# item reject the whole batch unless the request overrides it with ?atomic=
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 500))
+BULK_ATOMIC = os.environ.get('BULK_ATOMIC', 'false').lower() == 'true'
+
+# Serve the hot GET routes (articles, comments, categories, tags) from the async views in
+# api/modules/async_reads.py; asgi.py turns this on, WSGI deployments keep the DRF views
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'false').lower() == 'true'
+
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 20))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 100))
+
+ARTICLE_EXCERPT_LENGTH = int(os.environ.get('ARTICLE_EXCERPT_LENGTH', 200))
+ARTICLE_EXCERPT_MAX_LENGTH = int(os.environ.get('ARTICLE_EXCERPT_MAX_LENGTH', 1000))
+
+SUGGEST_DEFAULT_LIMIT = int(os.environ.get('SUGGEST_DEFAULT_LIMIT', 10))
+SUGGEST_MAX_LIMIT = int(os.environ.get('SUGGEST_MAX_LIMIT', 50))
+SUGGEST_INDEX_MAX_AGE = int(os.environ.get('SUGGEST_INDEX_MAX_AGE', 300))
+
+# 'buffered' batches ActivityLog writes off the request thread; 'sync' writes each one immediately
+ACTIVITY_LOG_MODE = os.environ.get('ACTIVITY_LOG_MODE', 'buffered')
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', 100))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', 2.0))
+# Raw ActivityLog rows older than this are rolled up daily by `manage.py prune_activity_log`
+ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get('ACTIVITY_LOG_RETENTION_DAYS', 90))
+
+# Site counters are split over this many rows each, so concurrent creates rarely wait on one row lock
+STATS_COUNTER_SHARDS = int(os.environ.get('STATS_COUNTER_SHARDS', 16))
+
+# In-process LRU used by CachedJWTAuthentication to avoid a User SELECT per request
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+# In-process slug -> id map behind the articles/<slug>/ routes
+SLUG_CACHE_SIZE = int(os.environ.get('SLUG_CACHE_SIZE', 4096))
+SLUG_CACHE_TTL = int(os.environ.get('SLUG_CACHE_TTL', 300))
+# How often each process pulls revocations made by other workers into its in-memory list
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 5))
+
 LOGIN_REDIRECT_URL = '/api/'
 LOGOUT_REDIRECT_URL = '/'
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'api.middleware.ApiCSRFExemptMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +128,34 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'content_management_system.wsgi.application'
 
+# Use a shared backend (e.g. django.core.cache.backends.redis.RedisCache) in production so that
+# cache invalidation by generation counters is seen by every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# Response caches (article detail, categories, tags; see api/caching.py). Off by default with
+# the per-process LocMemCache, where other workers would keep serving entries a write invalidated;
+# RESPONSE_CACHE=true turns them on anyway, e.g. for a single-process development server. While
+# they are off, the api.W001 check warns at startup (silence it to run without them on purpose);
+# article ETag / Last-Modified and 304s do not depend on them.
+RESPONSE_CACHE = os.environ.get(
+    'RESPONSE_CACHE', str(not CACHES['default']['BACKEND'].endswith('LocMemCache'))).lower() == 'true'
+ARTICLE_CACHE_TIMEOUT = int(os.environ.get('ARTICLE_CACHE_TIMEOUT', 300))
+TAXONOMY_CACHE_TIMEOUT = int(os.environ.get('TAXONOMY_CACHE_TIMEOUT', 3600))
+
+# Database connections are reused instead of opened per request. DB_POOL=true gives each worker
+# process a connection pool (Django's native pooling, on psycopg 3 and its pool extra from
+# requirements.txt); otherwise a connection stays open for DB_CONN_MAX_AGE
+# seconds. Reused connections are health-checked before use unless DB_HEALTH_CHECKS=false.
+# Prefer the pool under ASGI: persistent connections belong to a thread, and ASGI runs each
+# request's sync work in a thread of its own.
+# Counters: GET /api/admin/db/.
+DB_POOL = os.environ.get('DB_POOL', 'false').lower() == 'true'
+DB_HEALTH_CHECKS = os.environ.get('DB_HEALTH_CHECKS', 'true').lower() == 'true'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -90,9 +164,45 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        # Pooled connections are returned to the pool instead; Django requires 0 there
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # With DB_POOL this becomes the pool's check on every checkout
+        'CONN_HEALTH_CHECKS': DB_HEALTH_CHECKS,
+        'OPTIONS': {},
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        # Seconds a request may wait for a free connection before failing
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # Idle connections above min_size are closed after max_idle; every connection is
+        # replaced after max_lifetime, so server-side memory and failovers do not pin it forever
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+    }
+
+# Read replicas: DB_REPLICA_HOSTS=host1,host2 adds databases replica1, replica2, ... with the
+# primary's settings except host (and DB_REPLICA_PORT / DB_REPLICA_NAME when given). Safe-method
+# requests read from one of them; a client that wrote reads from the primary for the next
+# REPLICA_PIN_SECONDS (cookie, plus a per-user pin for token clients). See api/db_router.py.
+DB_REPLICA_HOSTS = [host.strip() for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+for number, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # Tests run against the primary only
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_router.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -108,21 +218,44 @@ USE_TZ = True
 STATIC_URL = os.environ.get('STATIC_URL')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Logging: handlers only queue records; a background thread per handler formats and writes
+# them, so request threads never wait on the disk or the console. The file gets JSON lines.
+# LOG_SAMPLE_RATES="api.permissions=0.1,django.db=0.01" keeps that fraction of a logger's
+# DEBUG/INFO records and LOG_RATE_LIMITS="api=50" caps them per second; both apply to child
+# loggers too, and warnings and errors always pass. See api/structured_logging.py.
+LOG_FILE = os.environ.get('LOG_FILE', 'debug.log')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {'format': '[{asctime}] {levelname} {module} {process:d} {thread:d} {message}', 'style': '{'},
         'simple': {'format': '[{asctime}] {levelname} {message}', 'style': '{'},
+        'json': {'()': 'api.structured_logging.JSONFormatter'},
+    },
+    'filters': {
+        'sampling': {
+            '()': 'api.structured_logging.SamplingFilter',
+            'sample_rates': os.environ.get('LOG_SAMPLE_RATES', ''),
+            'rate_limits': os.environ.get('LOG_RATE_LIMITS', ''),
+        },
     },
     'handlers': {
-        'console': {'level': 'DEBUG', 'class': 'logging.StreamHandler', 'formatter': 'verbose'},
-        'file': {'level': 'DEBUG', 'class': 'logging.FileHandler', 'filename': 'debug.log', 'formatter': 'verbose'},
+        'console': {
+            'level': 'DEBUG', 'class': 'api.structured_logging.BackgroundHandler',
+            'queue_size': LOG_QUEUE_SIZE, 'formatter': 'verbose', 'filters': ['sampling'],
+        },
+        'file': {
+            'level': 'DEBUG', 'class': 'api.structured_logging.BackgroundHandler', 'filename': LOG_FILE,
+            'queue_size': LOG_QUEUE_SIZE, 'formatter': 'json', 'filters': ['sampling'],
+        },
     },
-    'root': {'handlers': ['console', 'file'], 'level': 'INFO'},
+    'root': {'handlers': ['console', 'file'], 'level': os.environ.get('LOG_LEVEL', 'INFO')},
     'loggers': {
-        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': True},
-        'api': {'handlers': ['console', 'file'], 'level': 'DEBUG', 'propagate': True},
+        # Levels only: records propagate to the root's handlers, so each is written once
+        'django': {'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO')},
+        'api': {'level': os.environ.get('API_LOG_LEVEL', 'DEBUG')},
     },
 }
 
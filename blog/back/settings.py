@@ -1,3 +1,5 @@
+import os
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -7,30 +9,42 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'api.structured_logging.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'api.structured_logging.SamplingFilter',
+            'sample_rates': os.environ.get('LOG_SAMPLE_RATES', ''),
+            'rate_limits': os.environ.get('LOG_RATE_LIMITS', ''),
+        },
     },
     'handlers': {
         'console': {
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
+            'class': 'api.structured_logging.BackgroundHandler',
             'formatter': 'verbose',
+            'filters': ['sampling'],
         },
         'file': {
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': 'debug.log',
-            'formatter': 'verbose',
+            'class': 'api.structured_logging.BackgroundHandler',
+            'filename': os.environ.get('LOG_FILE', 'debug.log'),
+            'formatter': 'json',
+            'filters': ['sampling'],
         },
     },
+    'root': {
+        'handlers': ['console', 'file'],
+        'level': os.environ.get('LOG_LEVEL', 'INFO'),
+    },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
             'level': 'INFO',
-            'propagate': True,
         },
         'content_management_system': {
-            'handlers': ['console', 'file'],
             'level': 'DEBUG',
-            'propagate': True,
         },
     },
 }
@@ -56,7 +70,6 @@ REST_FRAMEWORK = {
 }
 
 from datetime import timedelta
-import os
 
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'your-development-key')
 
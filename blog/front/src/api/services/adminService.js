@@ -41,7 +41,8 @@ export const deleteUser = async (userId) => {
 export const getActivityLog = async () => {
     try {
         const response = await api.get(`/admin/activity/`);
-        return response.data;
+        // The activity feed is cursor-paginated: { next, previous, results }
+        return response.data.results;
     } catch (error) {
         console.error("Error fetching activity log:", error);
         throw handleApiError(error, "Failed to fetch activity log.");
@@ -15,7 +15,8 @@ export const getAllArticles = async () => {
     try{
         const response = await api.get(`/articles/`);
 
-        return response.data;
+        // The list endpoint is cursor-paginated: { next, previous, results }
+        return response.data.results;
     }
     catch(error){
         throw handleApiError(error);